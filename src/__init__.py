@@ -2,14 +2,42 @@
 
 Mantemos o ``__init__`` leve (sem reexports imediatos) para evitar
 importações pesadas desnecessárias quando apenas submódulos específicos
-forem usados (ex.: relatórios, sentimento, etc.).
+forem usados (ex.: relatórios, sentimento, etc.). ``Config``,
+``HttpClient``, ``Parser`` e ``Scraper`` são reexportados de forma lazy
+via ``__getattr__`` (PEP 562): o submódulo só é importado no primeiro acesso.
 """
 
+from importlib import import_module
+
 __all__ = [
-    # Reexports intencionais podem ser feitos via __getattr__ lazy se necessário.
+    "Config",
+    "HttpClient",
+    "Parser",
+    "Scraper",
     "main",
 ]
 
+# nome público -> submódulo que o define
+_LAZY_EXPORTS = {
+    "Config": ".config",
+    "HttpClient": ".http_client",
+    "Parser": ".parser",
+    "Scraper": ".scraper",
+}
+
+
+def __getattr__(name: str):
+    module = _LAZY_EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(import_module(module, __name__), name)
+    globals()[name] = value  # próximos acessos não passam mais por aqui
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
+
 
 def main() -> None:
     """Entrypoint programático para rodar o scraper.
@@ -24,5 +52,16 @@ def main() -> None:
 
     cfg = Config.from_env()
     client = HttpClient(cfg.headers)
-    parser = Parser()
-    Scraper(cfg, client, parser).run()
+    extra = (
+        (cfg.listing_item_selector, cfg.listing_link_selector, cfg.listing_date_selector)
+        if cfg.listing_item_selector
+        else ()
+    )
+    parser = Parser(cfg.article_sel, cfg.comment_sel, extra_selectors=extra)
+    scraper = Scraper(cfg, client, parser)
+    try:
+        scraper.run()
+    finally:
+        profile = scraper.storage.close()  # fecha o banco (e grava o perfil, se SQLITE_PROFILE=1)
+        if profile is not None:
+            print("Perfil SQL salvo em:", profile)
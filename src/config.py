@@ -1,14 +1,18 @@
 from __future__ import annotations
 
 import os
+import sys
 from dataclasses import dataclass
+from functools import lru_cache
 from pathlib import Path
-from typing import Dict, Tuple, List
+from types import MappingProxyType
+from typing import Mapping, Tuple, List
 
-from dotenv import load_dotenv
+# Configuração imutável; __slots__ quando disponível (Python 3.10+)
+_FROZEN = {"frozen": True, "slots": True} if sys.version_info >= (3, 10) else {"frozen": True}
 
 
-@dataclass
+@dataclass(**_FROZEN)
 class ArticleSelectors:
     link: str = "a.article-link"
     title: str = "h1.title"
@@ -16,7 +20,7 @@ class ArticleSelectors:
     date: str = "time"
 
 
-@dataclass
+@dataclass(**_FROZEN)
 class CommentSelectors:
     container: str = "article.comment"
     author: str = ".comment-author"
@@ -25,7 +29,7 @@ class CommentSelectors:
     permalink: str = "a.comment-permalink"
 
 
-@dataclass
+@dataclass(**_FROZEN)
 class Config:
     output_dir: Path
     raw_dir: Path
@@ -36,7 +40,7 @@ class Config:
     max_pages: int
     delay_range: Tuple[float, float]
     months_back: int
-    headers: Dict[str, str]
+    headers: Mapping[str, str]  # somente leitura (MappingProxyType)
     article_sel: ArticleSelectors
     comment_sel: CommentSelectors
     names: List[str]
@@ -50,20 +54,42 @@ class Config:
     listing_date_attr: str
     listing_start_page: int
     listing_end_page: int
+    # Requisições simultâneas na coleta dos artigos (1 = sequencial; >1 requer httpx)
+    http_concurrency: int
+    # Processos para o parsing do HTML dos artigos (0/1 = no processo principal)
+    parse_workers: int
+    # Pula links já gravados em ``artigos`` (coleta incremental)
+    skip_existing: bool
 
     @classmethod
     def from_env(cls) -> "Config":
-        load_dotenv()
+        """Configuração lida do ambiente/.env, montada uma vez por processo.
+
+        Chamadas seguintes devolvem a mesma instância; use ``reload()`` para
+        reler as variáveis de ambiente.
+        """
+        return _from_env_cached(cls)
+
+    @classmethod
+    def reload(cls) -> "Config":
+        global _dotenv_loaded
+        _dotenv_loaded = False
+        _from_env_cached.cache_clear()
+        return cls.from_env()
+
+    @classmethod
+    def _load_from_env(cls) -> "Config":
+        _load_dotenv_once()
 
         output_dir = Path(os.getenv("OUTPUT_DIR", "data"))
         raw_dir = output_dir / "raw"
         processed_dir = output_dir / "processed"
-        raw_dir.mkdir(parents=True, exist_ok=True)
-        processed_dir.mkdir(parents=True, exist_ok=True)
         # Caminho do banco SQLite (padrão: <OUTPUT_DIR>/rapagem.db)
         db_env = os.getenv("DB_PATH")
         db_path = Path(db_env) if db_env else (output_dir / "rapagem.db")
-        db_path.parent.mkdir(parents=True, exist_ok=True)
+        for d in (raw_dir, processed_dir, db_path.parent):
+            if not d.is_dir():
+                d.mkdir(parents=True, exist_ok=True)
 
         base_url = os.getenv("BASE_URL", "https://EXEMPLO.com")
         listing_tpl = os.getenv(
@@ -78,19 +104,21 @@ class Config:
         dmin, dmax = (os.getenv("REQUEST_DELAY_RANGE", "1,2").split(",") + ["2"])[:2]
         delay_range = (float(dmin), float(dmax))
 
+        # Padrões lidos de instâncias: com __slots__ o atributo de classe não é o default
+        da, dc = ArticleSelectors(), CommentSelectors()
         article_sel = ArticleSelectors(
-            link=os.getenv("ARTICLE_LINK_SELECTOR", ArticleSelectors.link),
-            title=os.getenv("ARTICLE_TITLE_SELECTOR", ArticleSelectors.title),
-            body=os.getenv("ARTICLE_BODY_SELECTOR", ArticleSelectors.body),
-            date=os.getenv("ARTICLE_DATE_SELECTOR", ArticleSelectors.date),
+            link=os.getenv("ARTICLE_LINK_SELECTOR", da.link),
+            title=os.getenv("ARTICLE_TITLE_SELECTOR", da.title),
+            body=os.getenv("ARTICLE_BODY_SELECTOR", da.body),
+            date=os.getenv("ARTICLE_DATE_SELECTOR", da.date),
         )
 
         comment_sel = CommentSelectors(
-            container=os.getenv("COMMENT_CONTAINER_SELECTOR", CommentSelectors.container),
-            author=os.getenv("COMMENT_AUTHOR_SELECTOR", CommentSelectors.author),
-            time=os.getenv("COMMENT_TIME_SELECTOR", CommentSelectors.time),
-            content=os.getenv("COMMENT_CONTENT_SELECTOR", CommentSelectors.content),
-            permalink=os.getenv("COMMENT_PERMALINK_SELECTOR", CommentSelectors.permalink),
+            container=os.getenv("COMMENT_CONTAINER_SELECTOR", dc.container),
+            author=os.getenv("COMMENT_AUTHOR_SELECTOR", dc.author),
+            time=os.getenv("COMMENT_TIME_SELECTOR", dc.time),
+            content=os.getenv("COMMENT_CONTENT_SELECTOR", dc.content),
+            permalink=os.getenv("COMMENT_PERMALINK_SELECTOR", dc.permalink),
         )
 
         # Seletores opcionais para data diretamente na listagem
@@ -115,14 +143,18 @@ class Config:
         if listing_end_page < listing_start_page:
             listing_end_page = listing_start_page
 
-        headers = {
+        http_concurrency = max(1, _to_int(os.getenv("HTTP_CONCURRENCY", "1"), 1))
+        parse_workers = max(0, _to_int(os.getenv("PARSE_WORKERS", "0"), 0))
+        skip_existing = os.getenv("SKIP_EXISTING", "0").strip().lower() in ("1", "true", "sim", "yes")
+
+        headers = MappingProxyType({
             "User-Agent": (
                 "Mozilla/5.0 (X11; Linux x86_64) "
                 "AppleWebKit/537.36 (KHTML, like Gecko) "
                 "Chrome/122.0 Safari/537.36"
             ),
             "Accept-Language": "pt-BR,pt;q=0.9,en-US;q=0.8,en;q=0.7",
-        }
+        })
 
         # Lista de nomes (filtro). Use vírgula, ponto-e-vírgula ou quebra de linha.
         raw_names = os.getenv("NAMES_FILTER", "").strip()
@@ -154,4 +186,25 @@ class Config:
             listing_date_attr=listing_date_attr,
             listing_start_page=listing_start_page,
             listing_end_page=listing_end_page,
+            http_concurrency=http_concurrency,
+            parse_workers=parse_workers,
+            skip_existing=skip_existing,
         )
+
+
+_dotenv_loaded = False
+
+
+def _load_dotenv_once() -> None:
+    global _dotenv_loaded
+    if _dotenv_loaded:
+        return
+    from dotenv import load_dotenv  # lazy: só quem lê o .env paga o import
+
+    load_dotenv()
+    _dotenv_loaded = True
+
+
+@lru_cache(maxsize=None)
+def _from_env_cached(cls) -> Config:
+    return cls._load_from_env()
@@ -1,17 +1,30 @@
 from __future__ import annotations
 
 import argparse
+import itertools
 import sqlite3
-from dataclasses import dataclass
 from pathlib import Path
-from typing import Dict, Iterable, List, Optional, Tuple
+from typing import Dict, Iterable, Iterator, List, NamedTuple, Optional, Tuple
 import re
-import unicodedata
-from datetime import datetime
 
-
-@dataclass
-class Article:
+try:
+    # when run as module
+    from .storage import tune_read_connection
+    from .textnorm import normalize as _norm
+except Exception:
+    # fallback for direct execution
+    import os
+    import sys
+    pkg_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    if pkg_root not in sys.path:
+        sys.path.insert(0, pkg_root)
+    from src.storage import tune_read_connection
+    from src.textnorm import normalize as _norm
+
+
+# NamedTuple: construídos direto das tuplas do cursor (``_make``), sem __dict__.
+# A ordem dos campos segue a ordem das colunas nas consultas abaixo.
+class Article(NamedTuple):
     url: str
     title: str
     date: str
@@ -19,8 +32,7 @@ class Article:
     scraped_at: str
 
 
-@dataclass
-class Comment:
+class Comment(NamedTuple):
     author: str
     time_text: str
     time_iso: str
@@ -32,12 +44,6 @@ def ensure_dir(p: Path) -> None:
     p.mkdir(parents=True, exist_ok=True)
 
 
-def _norm(s: str) -> str:
-    t = unicodedata.normalize("NFKD", s or "")
-    t = "".join(ch for ch in t if not unicodedata.combining(ch))
-    return " ".join(t.lower().split())
-
-
 PT_MONTHS: Dict[str, int] = {
     "janeiro": 1,
     "fevereiro": 2,
@@ -67,25 +73,36 @@ PT_MONTHS: Dict[str, int] = {
 }
 
 
+# Padrões de data compilados uma vez (usados para cada artigo da exportação)
+_ISO_YMD_RE = re.compile(r"(\d{4})-(\d{1,2})-(\d{1,2})")
+_DMY_RE = re.compile(r"(\d{1,2})/(\d{1,2})/(\d{4})")
+_D_DE_MES_RE = re.compile(r"(\d{1,2})\s+de\s+([a-z]+)\s+de\s+(\d{4})")
+_MES_D_Y_RE = re.compile(r"([a-z]+)\s+(\d{1,2}),?\s+(\d{4})")
+_ISO_YM_RE = re.compile(r"(\d{4})-(\d{1,2})")
+# Argumento --months: YYYY-M, YYYY-MM, YYYY/M, YYYY_M ou YYYYMM
+_YM_ARG_RE = re.compile(r"^(\d{4})[-_/]?(\d{1,2})$")
+_YM_COMPACT_RE = re.compile(r"^(\d{4})(\d{2})$")
+
+
 def _ym_from_article_date(date_text: str) -> Optional[str]:
     if not date_text:
         return None
     s = date_text.strip()
     # 1) ISO YYYY-MM-DD
-    m = re.search(r"(\d{4})-(\d{1,2})-(\d{1,2})", s)
+    m = _ISO_YMD_RE.search(s)
     if m:
         y, mo = int(m.group(1)), int(m.group(2))
         if 1 <= mo <= 12:
             return f"{y:04d}-{mo:02d}"
     # 2) DD/MM/YYYY
-    m = re.search(r"(\d{1,2})/(\d{1,2})/(\d{4})", s)
+    m = _DMY_RE.search(s)
     if m:
         y, mo = int(m.group(3)), int(m.group(2))
         if 1 <= mo <= 12:
             return f"{y:04d}-{mo:02d}"
     # 3) "D de mês de YYYY"
     ns = _norm(s)
-    m = re.search(r"(\d{1,2})\s+de\s+([a-z]+)\s+de\s+(\d{4})", ns)
+    m = _D_DE_MES_RE.search(ns)
     if m:
         y = int(m.group(3))
         mname = m.group(2)
@@ -93,7 +110,7 @@ def _ym_from_article_date(date_text: str) -> Optional[str]:
         if mo:
             return f"{y:04d}-{mo:02d}"
     # 4) "mês D, YYYY"
-    m = re.search(r"([a-z]+)\s+(\d{1,2}),?\s+(\d{4})", ns)
+    m = _MES_D_Y_RE.search(ns)
     if m:
         y = int(m.group(3))
         mname = m.group(1)
@@ -101,7 +118,7 @@ def _ym_from_article_date(date_text: str) -> Optional[str]:
         if mo:
             return f"{y:04d}-{mo:02d}"
     # 5) ISO YYYY-MM
-    m = re.search(r"(\d{4})-(\d{1,2})", s)
+    m = _ISO_YM_RE.search(s)
     if m:
         y, mo = int(m.group(1)), int(m.group(2))
         if 1 <= mo <= 12:
@@ -109,16 +126,74 @@ def _ym_from_article_date(date_text: str) -> Optional[str]:
     return None
 
 
-def fetch_articles_all(cur: sqlite3.Cursor) -> List[Article]:
+# Mesmos caracteres que str.strip() remove (str.isspace), para aparar os textos
+# já no SELECT: os campos chegam limpos e fmt_md_article não chama .strip().
+# scraped_at não é aparado (é usado como veio, inclusive na ordenação).
+_WS = (
+    "char(9, 10, 11, 12, 13, 28, 29, 30, 31, 32, 133, 160, 5760, 8192, 8193, 8194, "
+    "8195, 8196, 8197, 8198, 8199, 8200, 8201, 8202, 8232, 8233, 8239, 8287, 12288)"
+)
+
+
+def fetch_articles_all(cur: sqlite3.Cursor) -> Iterator[Article]:
     cur.execute(
-        """
-        SELECT url, COALESCE(title,''), COALESCE(date,''),
-               COALESCE(body,''), COALESCE(scraped_at,'')
+        f"""
+        SELECT url, TRIM(COALESCE(title,''), {_WS}), TRIM(COALESCE(date,''), {_WS}),
+               TRIM(COALESCE(body,''), {_WS}), COALESCE(scraped_at,'')
         FROM artigos
         """
     )
-    rows = cur.fetchall()
-    return [Article(url=r[0], title=r[1], date=r[2], body=r[3], scraped_at=r[4]) for r in rows]
+    # Gerador: as linhas vão direto do cursor, sem lista intermediária
+    yield from map(Article._make, cur)
+
+
+# Mês (YYYY-MM) resolvido no próprio SQLite para os formatos mais comuns da
+# coluna date: ISO no início do texto e DD/MM/YYYY (sem '-', para não passar à
+# frente de uma data ISO em outra posição). Nos demais casos retorna NULL e o
+# mês sai de _ym_from_article_date. scraped_ym é o mês de scraped_at quando ele
+# está no formato do CURRENT_TIMESTAMP e é uma data válida (datetime() com um
+# modificador normaliza datas como 30/02, então a comparação falha); senão NULL
+# e vale o fallback em Python.
+_ARTICLES_WITH_MONTH_SQL = f"""
+    SELECT
+      CASE
+        WHEN date GLOB '[0-9][0-9][0-9][0-9]-[0-9][0-9]-[0-9]*'
+             AND substr(date, 6, 2) BETWEEN '01' AND '12'
+          THEN substr(date, 1, 7)
+        WHEN date GLOB '[0-9][0-9]/[0-9][0-9]/[0-9][0-9][0-9][0-9]*'
+             AND instr(date, '-') = 0
+             AND substr(date, 4, 2) BETWEEN '01' AND '12'
+          THEN substr(date, 7, 4) || '-' || substr(date, 4, 2)
+      END AS ym,
+      CASE
+        WHEN datetime(scraped_at, '+0 days') = scraped_at
+             AND substr(scraped_at, 1, 4) <> '0000'
+          THEN substr(scraped_at, 1, 7)
+      END AS scraped_ym,
+      url, TRIM(COALESCE(title,''), {_WS}), TRIM(COALESCE(date,''), {_WS}),
+      TRIM(COALESCE(body,''), {_WS}), COALESCE(scraped_at,'') AS scraped
+    FROM artigos
+    ORDER BY scraped, rowid
+"""
+
+
+def fetch_articles_with_month(
+    cur: sqlite3.Cursor,
+) -> Iterator[Tuple[Optional[str], Optional[str], Article]]:
+    """Artigos em ordem de scraped_at, com (mês da data, mês de scraped_at) do SQL (ou None)."""
+    cur.execute(_ARTICLES_WITH_MONTH_SQL)
+    for r in cur:
+        yield r[0], r[1], Article._make(r[2:])
+
+
+def _ym_from_scraped_at(scraped_at: str) -> Optional[str]:
+    from datetime import datetime  # só para formatos que o SQL não resolveu
+
+    try:
+        dt = datetime.fromisoformat(scraped_at.replace("Z", "+00:00"))
+    except Exception:
+        return None
+    return f"{dt.year:04d}-{dt.month:02d}"
 
 
 def fetch_people(cur: sqlite3.Cursor, article_url: str) -> List[str]:
@@ -137,79 +212,113 @@ def fetch_people(cur: sqlite3.Cursor, article_url: str) -> List[str]:
 
 def fetch_comments(cur: sqlite3.Cursor, article_url: str) -> List[Comment]:
     cur.execute(
-        """
-        SELECT COALESCE(author,''), COALESCE(time_text,''), COALESCE(time_iso,''),
-               COALESCE(content,''), COALESCE(scraped_at,'')
+        f"""
+        SELECT TRIM(COALESCE(author,''), {_WS}), TRIM(COALESCE(time_text,''), {_WS}),
+               TRIM(COALESCE(time_iso,''), {_WS}), TRIM(COALESCE(content,''), {_WS}),
+               COALESCE(scraped_at,'')
         FROM comentarios
         WHERE article_url = ?
         ORDER BY scraped_at ASC
         """,
         (article_url,),
     )
-    rows = cur.fetchall()
-    return [Comment(author=r[0], time_text=r[1], time_iso=r[2], content=r[3], scraped_at=r[4]) for r in rows]
+    return list(map(Comment._make, cur))
+
+
+# Tabela temporária com as URLs do mês em exportação: permite buscar citados e
+# comentários de todos os artigos do mês em duas consultas (em vez de 2 por artigo).
+_STAGE_TABLE = "_export_urls"
+
+
+def _stage_urls(cur: sqlite3.Cursor, urls: Iterable[str]) -> None:
+    cur.execute(f"CREATE TEMP TABLE IF NOT EXISTS {_STAGE_TABLE} (url TEXT PRIMARY KEY)")
+    cur.execute(f"DELETE FROM {_STAGE_TABLE}")
+    cur.executemany(
+        f"INSERT OR IGNORE INTO {_STAGE_TABLE} (url) VALUES (?)",
+        ((u,) for u in urls),
+    )
+
+
+def fetch_people_staged(cur: sqlite3.Cursor) -> Dict[str, List[str]]:
+    cur.execute(
+        f"""
+        SELECT ap.article_url, p.name
+        FROM {_STAGE_TABLE} s
+        JOIN artigos_pessoas ap ON ap.article_url = s.url
+        JOIN pessoas p ON p.id = ap.person_id
+        ORDER BY ap.article_url, p.name ASC
+        """
+    )
+    return {
+        url: [r[1] for r in grp if r[1]]
+        for url, grp in itertools.groupby(cur, key=lambda r: r[0])
+    }
+
+
+def fetch_comments_staged(cur: sqlite3.Cursor) -> Dict[str, List[Comment]]:
+    cur.execute(
+        f"""
+        SELECT c.article_url,
+               TRIM(COALESCE(c.author,''), {_WS}), TRIM(COALESCE(c.time_text,''), {_WS}),
+               TRIM(COALESCE(c.time_iso,''), {_WS}), TRIM(COALESCE(c.content,''), {_WS}),
+               COALESCE(c.scraped_at,'')
+        FROM {_STAGE_TABLE} s
+        JOIN comentarios c ON c.article_url = s.url
+        ORDER BY c.article_url, c.scraped_at ASC, c.rowid ASC
+        """
+    )
+    return {
+        url: [Comment._make(r[1:]) for r in grp]
+        for url, grp in itertools.groupby(cur, key=lambda r: r[0])
+    }
+
+
+_NO_NAMES = "- (sem citações registradas)"
+_NO_COMMENTS = "- (sem comentários)"
+
+
+def _fmt_comment(c: Comment) -> str:
+    when = c.time_text or c.time_iso or c.scraped_at
+    author = c.author or "Anônimo"
+    # Uma linha por comentário para facilitar parsing
+    content = c.content.replace('\n', ' ')
+    return f"- {author} — {when}: {content}"
 
 
 def fmt_md_article(a: Article, names: List[str], comments: List[Comment]) -> str:
-    lines: List[str] = []
-    # Título
-    lines.append(f"## {a.title.strip() or '(sem título)'}")
     # Data preferindo a data do site; fallback para scraped_at
-    date_text = (a.date or '').strip() or a.scraped_at
-    lines.append(f"Data: {date_text}")
-    # Lista de citados
-    lines.append("Citações:")
-    if names:
-        for n in names:
-            lines.append(f"- {n}")
-    else:
-        lines.append("- (sem citações registradas)")
-    # Corpo
-    lines.append("")
-    lines.append("Corpo:")
-    body = (a.body or '').strip()
-    if body:
-        lines.append(body)
-    else:
-        lines.append("(sem corpo)")
-    # Comentários
-    lines.append("")
-    lines.append("Comentários:")
-    if comments:
-        for c in comments:
-            when = c.time_text.strip() or c.time_iso.strip() or c.scraped_at
-            author = c.author.strip() or "Anônimo"
-            # Uma linha por comentário para facilitar parsing
-            content = (c.content or '').strip().replace('\n', ' ')
-            lines.append(f"- {author} — {when}: {content}")
-    else:
-        lines.append("- (sem comentários)")
-    lines.append("")
-    return "\n".join(lines)
+    date_text = a.date or a.scraped_at
+    names_block = "\n".join(f"- {n}" for n in names) or _NO_NAMES
+    body = a.body or "(sem corpo)"
+    comments_block = "\n".join(map(_fmt_comment, comments)) or _NO_COMMENTS
+    return (
+        f"## {a.title or '(sem título)'}\n"
+        f"Data: {date_text}\n"
+        f"Citações:\n{names_block}\n"
+        f"\nCorpo:\n{body}\n"
+        f"\nComentários:\n{comments_block}\n"
+    )
 
 
 def export_month(cur: sqlite3.Cursor, ym: str, articles: List[Article], out_dir: Path) -> Path:
     out_path = out_dir / f"{ym}.md"
-    with out_path.open("w", encoding="utf-8") as f:
-        # Cabeçalho do arquivo
-        f.write(f"# {ym}\n\n")
-        for idx, a in enumerate(articles, start=1):
-            names = fetch_people(cur, a.url)
-            comments = fetch_comments(cur, a.url)
-            block = fmt_md_article(a, names, comments)
-            f.write(block)
-            if idx != len(articles):
-                f.write("\n\n")
+    _stage_urls(cur, (a.url for a in articles))
+    people = fetch_people_staged(cur)
+    comments = fetch_comments_staged(cur)
+    # Cabeçalho + blocos separados por linha em branco, gravados de uma vez
+    blocks = "\n\n".join(
+        fmt_md_article(a, people.get(a.url, []), comments.get(a.url, [])) for a in articles
+    )
+    out_path.write_bytes(f"# {ym}\n\n{blocks}".encode("utf-8"))
     return out_path
 
 
 def _normalize_ym(value: str) -> str:
     s = value.strip()
-    # Accept forms: YYYY-M, YYYY-MM, YYYY/M, YYYY_M, YYYYMM
-    m = re.match(r"^(\d{4})[-_/]?(\d{1,2})$", s)
+    m = _YM_ARG_RE.match(s)
     if not m:
         # Try compact YYYYMM
-        m2 = re.match(r"^(\d{4})(\d{2})$", s)
+        m2 = _YM_COMPACT_RE.match(s)
         if not m2:
             return s  # fallback unchanged
         year, month = int(m2.group(1)), int(m2.group(2))
@@ -222,26 +331,19 @@ def _normalize_ym(value: str) -> str:
 
 def run(db: Path, out: Path, only_months: Optional[Iterable[str]] = None) -> List[Path]:
     ensure_dir(out)
-    con = sqlite3.connect(str(db))
+
+    con = tune_read_connection(sqlite3.connect(str(db)))
     try:
         cur = con.cursor()
         # Agrupa por mês da data da notícia; se não der para parsear, usa scraped_at
-        all_articles = fetch_articles_all(cur)
+        # (os artigos já chegam ordenados por scraped_at, então cada mês também)
         buckets: Dict[str, List[Article]] = {}
-        for a in all_articles:
-            ym = _ym_from_article_date(a.date)
+        for ym, scraped_ym, a in fetch_articles_with_month(cur):
+            ym = ym or _ym_from_article_date(a.date) or scraped_ym or _ym_from_scraped_at(a.scraped_at)
             if not ym:
-                try:
-                    dt = datetime.fromisoformat(a.scraped_at.replace("Z", "+00:00"))
-                    ym = f"{dt.year:04d}-{dt.month:02d}"
-                except Exception:
-                    continue
+                continue
             buckets.setdefault(ym, []).append(a)
 
-        # Ordena por scraped_at dentro de cada mês
-        for arr in buckets.values():
-            arr.sort(key=lambda x: x.scraped_at)
-
         months = sorted(buckets.keys())
         if only_months:
             wanted = {_normalize_ym(m) for m in only_months}
@@ -1,23 +1,41 @@
 from __future__ import annotations
 
-import unicodedata
-from typing import List, Tuple
+from typing import Dict, List, Tuple
 
+from .textnorm import normalize as _normalize
 
-def _normalize(text: str) -> str:
-    # Lowercase + remove diacritics + collapse spaces
-    if not text:
-        return ""
-    t = unicodedata.normalize("NFKD", text)
-    t = "".join(ch for ch in t if not unicodedata.combining(ch))
-    t = " ".join(t.lower().split())
-    return t
+try:  # opcional: busca multi-padrão em uma única passada
+    import ahocorasick
+except ImportError:  # pragma: no cover - depende do ambiente
+    ahocorasick = None
 
 
 class NameFilter:
     def __init__(self, names: List[str] | None = None):
         self.original: List[str] = [n for n in (names or []) if n.strip()]
         self.normalized: List[str] = [_normalize(n) for n in self.original]
+        # Pares (original, normalizado) sem chaves vazias, para o caminho sem automato.
+        # Busca direta em str: o texto normalizado é quase sempre ASCII (1 byte por
+        # caractere) e ``in`` já usa a busca rápida do CPython; codificar para bytes
+        # só acrescentaria o custo do encode.
+        self._pairs: List[Tuple[str, str]] = [
+            (orig, nn) for orig, nn in zip(self.original, self.normalized) if nn
+        ]
+        self._ac = self._build_automaton() if ahocorasick is not None else None
+
+    def _build_automaton(self):
+        # Nomes distintos podem normalizar para a mesma chave ("José"/"Jose")
+        by_norm: Dict[str, List[int]] = {}
+        for idx, nn in enumerate(self.normalized):
+            if nn:
+                by_norm.setdefault(nn, []).append(idx)
+        if not by_norm:
+            return None
+        ac = ahocorasick.Automaton()
+        for nn, idxs in by_norm.items():
+            ac.add_word(nn, tuple(idxs))
+        ac.make_automaton()
+        return ac
 
     def enabled(self) -> bool:
         return len(self.normalized) > 0
@@ -26,9 +44,11 @@ class NameFilter:
         if not self.enabled():
             return True, []
         nt = _normalize(text or "")
-        matched: List[str] = []
-        for orig, nn in zip(self.original, self.normalized):
-            if nn and nn in nt:
-                matched.append(orig)
+        if self._ac is not None:
+            found = set()
+            for _, idxs in self._ac.iter(nt):
+                found.update(idxs)
+            matched = [self.original[i] for i in sorted(found)]
+            return (len(matched) > 0), matched
+        matched = [orig for orig, nn in self._pairs if nn in nt]
         return (len(matched) > 0), matched
-
@@ -1,25 +1,112 @@
 from __future__ import annotations
 
-import time
-from typing import Dict
+import asyncio
+from typing import Iterable, List, Mapping
 
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 
 
 class HttpClient:
-    def __init__(self, headers: Dict[str, str]):
+    def __init__(self, headers: Mapping[str, str], *, pool_size: int = 32):
         self.session = requests.Session()
         self.session.headers.update(headers)
+        # Até 4 tentativas (3 retries) em falhas de conexão/leitura e 5xx
+        # transitórios, com backoff exponencial e respeito a Retry-After.
+        retry = Retry(
+            total=3,
+            backoff_factor=0.5,
+            status_forcelist=(500, 502, 503, 504),
+            allowed_methods=frozenset(["GET"]),
+            respect_retry_after_header=True,
+        )
+        # Pool maior + keep-alive: reaproveita conexões com o mesmo host
+        adapter = HTTPAdapter(max_retries=retry, pool_connections=pool_size, pool_maxsize=pool_size)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
 
     def fetch(self, url: str, *, timeout: int = 20) -> requests.Response:
-        for attempt in range(4):
+        resp = self.session.get(url, timeout=timeout)
+        if resp.status_code >= 500:
+            # 5xx fora do status_forcelist (ex.: 501) não são re-tentados
+            raise requests.HTTPError(f"Status {resp.status_code}", response=resp)
+        return resp
+
+
+class AsyncHttpClient:
+    """Cliente assíncrono (httpx) para buscar várias páginas em paralelo.
+
+    Dependência opcional: requer ``httpx`` (e ``h2`` para HTTP/2). Mantém a
+    mesma política do ``HttpClient``: até 4 tentativas em erros de transporte
+    e 5xx transitórios, com backoff exponencial.
+    """
+
+    _RETRY_STATUS = (500, 502, 503, 504)
+
+    def __init__(
+        self,
+        headers: Mapping[str, str],
+        *,
+        max_connections: int = 16,
+        http2: bool = True,
+        retries: int = 3,
+        backoff_factor: float = 0.5,
+    ):
+        import importlib.util
+
+        import httpx  # lazy: só exigido quando a busca concorrente é usada
+
+        self._httpx = httpx
+        self.retries = retries
+        self.backoff_factor = backoff_factor
+        self._client = httpx.AsyncClient(
+            headers=dict(headers),
+            http2=http2 and importlib.util.find_spec("h2") is not None,
+            # Keep-alive para todas as conexões do pool: sem novo handshake por artigo
+            limits=httpx.Limits(
+                max_connections=max_connections,
+                max_keepalive_connections=max_connections,
+            ),
+            follow_redirects=True,  # mesmo comportamento do requests
+        )
+
+    async def __aenter__(self) -> "AsyncHttpClient":
+        return self
+
+    async def __aexit__(self, *exc) -> None:
+        await self.aclose()
+
+    async def aclose(self) -> None:
+        await self._client.aclose()
+
+    async def fetch(self, url: str, *, timeout: int = 20):
+        httpx = self._httpx
+        for attempt in range(self.retries + 1):
+            last = attempt == self.retries
             try:
-                resp = self.session.get(url, timeout=timeout)
-                if resp.status_code >= 500:
-                    raise requests.HTTPError(f"Status {resp.status_code}")
-                return resp
-            except Exception as e:
-                if attempt == 3:
-                    raise e
-                time.sleep(1.0)
+                resp = await self._client.get(url, timeout=timeout)
+            except httpx.TransportError:
+                if last:
+                    raise
+            else:
+                if resp.status_code < 500:
+                    return resp
+                if last or resp.status_code not in self._RETRY_STATUS:
+                    raise httpx.HTTPStatusError(
+                        f"Status {resp.status_code}", request=resp.request, response=resp
+                    )
+            await asyncio.sleep(self.backoff_factor * (2 ** attempt))
+
+    async def fetch_all(self, urls: Iterable[str], *, concurrency: int = 8) -> List:
+        """Busca ``urls`` com no máximo ``concurrency`` requisições em voo.
+
+        Retorna, na ordem de ``urls``, a resposta ou a exceção da respectiva URL.
+        """
+        sem = asyncio.Semaphore(max(1, concurrency))
+
+        async def one(u: str):
+            async with sem:
+                return await self.fetch(u)
 
+        return await asyncio.gather(*(one(u) for u in urls), return_exceptions=True)
@@ -1,64 +1,120 @@
 from __future__ import annotations
 
-import re
-from typing import Dict, List, Optional
+from dataclasses import astuple
+from datetime import datetime
+from functools import lru_cache
+from typing import Dict, Iterable, List, Optional
 from urllib.parse import urljoin
 
-from bs4 import BeautifulSoup
+import lxml.html
+from lxml import etree
+from lxml.cssselect import CSSSelector
 
 from .config import ArticleSelectors, CommentSelectors
 
 
+# Texto "visível": ignora conteúdo de <script>/<style>/<template>, como o
+# ``stripped_strings`` do BeautifulSoup fazia.
+_TEXT_NODES = etree.XPath(
+    ".//text()[not(ancestor::script or ancestor::style or ancestor::template)]",
+    smart_strings=False,
+)
+
+
+@lru_cache(maxsize=None)
+def _css(selector: str) -> CSSSelector:
+    """Compila o seletor CSS uma única vez por processo."""
+    return CSSSelector(selector, translator="html")
+
+
+@lru_cache(maxsize=1)
+def _doc(html: str):
+    """Constrói a árvore lxml tolerando documentos vazios.
+
+    Guarda a última árvore: ``parse_article`` e ``parse_comments`` recebem o
+    mesmo HTML e ele é parseado uma vez só. Os métodos não alteram a árvore.
+    """
+    if not html or not html.strip():
+        return lxml.html.Element("html")
+    try:
+        return lxml.html.document_fromstring(html)
+    except ValueError:
+        # str com declaração de encoding (<?xml ... encoding=...?>)
+        return lxml.html.document_fromstring(html.encode("utf-8"))
+    except etree.ParserError:
+        return lxml.html.Element("html")
+
+
+@lru_cache(maxsize=4096)
+def _parse_iso_datetime(text: Optional[str]) -> Optional[str]:
+    """Retorna o texto ISO normalizado ('Z' -> '+00:00') se for válido, senão None.
+
+    Com cache: listagens repetem o mesmo horário de publicação em vários itens.
+    """
+    if not text:
+        return None
+    try:
+        t = text.strip().replace("Z", "+00:00")
+        datetime.fromisoformat(t)
+        return t
+    except Exception:
+        return None
+
+
+def _select_one(root, selector: str):
+    return next(iter(_css(selector)(root)), None)
+
+
 class Parser:
+    def __init__(
+        self,
+        article_sel: Optional[ArticleSelectors] = None,
+        comment_sel: Optional[CommentSelectors] = None,
+        *,
+        extra_selectors: Iterable[str] = (),
+    ):
+        """Pré-compila os seletores informados.
+
+        Os métodos usam o cache de ``_css``; compilar aqui evita o custo na
+        primeira página e faz um seletor inválido falhar já na inicialização.
+        """
+        selectors: List[str] = []
+        for sel in (article_sel, comment_sel):
+            if sel is not None:
+                selectors.extend(astuple(sel))
+        selectors.extend(extra_selectors)
+        for s in selectors:
+            if s:
+                _css(s)
+
     @staticmethod
     def extract_text(el) -> str:
         if el is None:
             return ""
-        text = " ".join(el.stripped_strings)
-        return re.sub(r"\s+", " ", text).strip()
+        return " ".join(" ".join(_TEXT_NODES(el)).split())
 
     @staticmethod
     def parse_listing(html: str, *, base_url: str, link_selector: str) -> List[str]:
-        soup = BeautifulSoup(html, "lxml")
-        links: List[str] = []
-        for a in soup.select(link_selector):
-            href = a.get("href")
-            if not href:
-                continue
-            links.append(urljoin(base_url, href))
+        doc = _doc(html)
+        hrefs = (a.get("href") for a in _css(link_selector)(doc))
+        links = (urljoin(base_url, href) for href in hrefs if href)
+        # dict preserva a ordem de inserção: remove duplicatas mantendo a primeira
+        return list(dict.fromkeys(links))
 
-        seen = set()
-        uniq: List[str] = []
-        for u in links:
-            if u not in seen:
-                seen.add(u)
-                uniq.append(u)
-        return uniq
-
-    @staticmethod
-    def _parse_iso_datetime(text: Optional[str]):
-        if not text:
-            return None
-        from datetime import datetime
-        try:
-            t = text.strip().replace("Z", "+00:00")
-            _ = datetime.fromisoformat(t)
-            return t
-        except Exception:
-            return None
+    _parse_iso_datetime = staticmethod(_parse_iso_datetime)
 
     @staticmethod
     def parse_article(html: str, url: str, sel: ArticleSelectors) -> Dict:
-        soup = BeautifulSoup(html, "lxml")
-        title_el = soup.select_one(sel.title)
-        body_el = soup.select_one(sel.body)
-        date_el = soup.select_one(sel.date)
+        doc = _doc(html)
+        title_el = _select_one(doc, sel.title)
+        body_el = _select_one(doc, sel.body)
+        date_el = _select_one(doc, sel.date)
         return {
             "url": url,
             "title": Parser.extract_text(title_el),
             "body": Parser.extract_text(body_el),
             "date": Parser.extract_text(date_el),
-            "date_iso": Parser._parse_iso_datetime(date_el.get("datetime") if date_el else None),
+            "date_iso": Parser._parse_iso_datetime(date_el.get("datetime") if date_el is not None else None),
         }
 
     @staticmethod
@@ -76,18 +132,18 @@ class Parser:
         Requer que cada item de listagem seja selecionável por `item_selector`.
         Dentro dele, serão buscados `link_selector` e `date_selector`.
         """
-        soup = BeautifulSoup(html, "lxml")
+        doc = _doc(html)
         out: List[Dict] = []
-        for item in soup.select(item_selector):
-            a = item.select_one(link_selector)
-            if not a:
+        for item in _css(item_selector)(doc):
+            a = _select_one(item, link_selector)
+            if a is None:
                 continue
             href = a.get("href")
             if not href:
                 continue
             url = urljoin(base_url, href)
 
-            d_el = item.select_one(date_selector)
+            d_el = _select_one(item, date_selector)
             d_iso = None
             if d_el is not None:
                 # primeiro tenta atributo (ex.: datetime)
@@ -95,23 +151,23 @@ class Parser:
                     d_iso = Parser._parse_iso_datetime(d_el.get(date_attr))
                 if not d_iso:
                     # tenta texto sem formatação (só ISO simples)
-                    d_iso = Parser._parse_iso_datetime(d_el.get_text(strip=True))
+                    d_iso = Parser._parse_iso_datetime("".join(s.strip() for s in _TEXT_NODES(d_el)))
 
             out.append({"url": url, "date_iso": d_iso})
         return out
 
     @staticmethod
     def parse_comments(html: str, url: str, sel: CommentSelectors) -> List[Dict]:
-        soup = BeautifulSoup(html, "lxml")
+        doc = _doc(html)
         out: List[Dict] = []
-        for c in soup.select(sel.container):
+        for c in _css(sel.container)(doc):
             cid = c.get("id", "")
-            author_el = c.select_one(sel.author)
-            time_el = c.select_one(sel.time)
-            content_el = c.select_one(sel.content)
-            permalink_el = c.select_one(sel.permalink)
+            author_el = _select_one(c, sel.author)
+            time_el = _select_one(c, sel.time)
+            content_el = _select_one(c, sel.content)
+            permalink_el = _select_one(c, sel.permalink)
 
-            href = permalink_el.get("href") if permalink_el else ""
+            href = permalink_el.get("href") if permalink_el is not None else ""
             permalink = urljoin(url, href) if href else ""
 
             out.append(
@@ -120,7 +176,7 @@ class Parser:
                     "comment_id": cid,
                     "author": Parser.extract_text(author_el),
                     "time_text": Parser.extract_text(time_el),
-                    "time_iso": time_el.get("datetime") if time_el else "",
+                    "time_iso": time_el.get("datetime") if time_el is not None else "",
                     "content": Parser.extract_text(content_el),
                     "permalink": permalink,
                 }
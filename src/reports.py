@@ -7,6 +7,18 @@ from dataclasses import dataclass
 from pathlib import Path
 from typing import Iterable, Sequence, Tuple
 
+try:
+    # when run as module
+    from .storage import tune_read_connection
+except Exception:
+    # fallback for direct execution
+    import os
+    import sys
+    pkg_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    if pkg_root not in sys.path:
+        sys.path.insert(0, pkg_root)
+    from src.storage import tune_read_connection
+
 
 @dataclass
 class Report:
@@ -20,16 +32,20 @@ def _ensure_dir(p: Path) -> None:
     p.mkdir(parents=True, exist_ok=True)
 
 
+# Buffer de escrita dos CSVs: menos flushes/syscalls nos relatórios grandes
+_CSV_BUFFER_SIZE = 1024 * 1024
+
+
 def _write_csv(cur: sqlite3.Cursor, query: str, out_path: Path, params: Sequence | None = None) -> None:
     params = params or []
     cur.execute(query, params)
-    rows = cur.fetchall()
     headers = [d[0] for d in cur.description or []]
-    with out_path.open("w", newline="", encoding="utf-8") as f:
+    with out_path.open("w", newline="", encoding="utf-8", buffering=_CSV_BUFFER_SIZE) as f:
         w = csv.writer(f)
         if headers:
             w.writerow(headers)
-        w.writerows(rows)
+        # Itera o cursor direto: as linhas são gravadas à medida que chegam
+        w.writerows(cur)
 
 
 def build_reports() -> list[Report]:
@@ -46,7 +62,15 @@ def build_reports() -> list[Report]:
                   a.url AS url,
                   a.date AS data,
                   a.title AS titulo,
-                  a.matched_names AS citacoes,
+                  (
+                    SELECT group_concat(name, '; ') FROM (
+                      SELECT p.name AS name
+                      FROM artigos_pessoas ap
+                      JOIN pessoas p ON p.id = ap.person_id
+                      WHERE ap.article_url = a.url
+                      ORDER BY ap.rowid
+                    )
+                  ) AS citacoes,
                   LENGTH(COALESCE(a.body,'')) AS tamanho_corpo,
                   (SELECT COUNT(1) FROM comentarios c WHERE c.article_url = a.url) AS qtd_comentarios,
                   a.scraped_at AS raspado_em
@@ -166,6 +190,7 @@ def build_reports() -> list[Report]:
     )
 
     # 7) Timeline mensal por pessoa (com base em scraped_at)
+    #    strftime normaliza offsets e devolve NULL para datas inválidas
     r.append(
         Report(
             name="timeline_person_month",
@@ -214,7 +239,7 @@ def generate_reports(db_path: Path, out_dir: Path, only: Iterable[str] | None =
     out_files: list[Path] = []
     _ensure_dir(out_dir)
 
-    con = sqlite3.connect(str(db_path))
+    con = tune_read_connection(sqlite3.connect(str(db_path)))
     try:
         cur = con.cursor()
         for rep in build_reports():
@@ -1,21 +1,129 @@
 from __future__ import annotations
 
+import asyncio
 import calendar
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from contextlib import closing
 from datetime import datetime, timezone
+from functools import lru_cache
 import random
+import threading
 import time
-from typing import Dict, List, Tuple
+from typing import Deque, Dict, Iterable, Iterator, List, Tuple
 
 import pandas as pd
 from tqdm import tqdm
 
 from .config import Config
-from .http_client import HttpClient
+from .http_client import AsyncHttpClient, HttpClient
 from .parser import Parser
 from .filtering import NameFilter
 from .storage import SQLiteStorage
 
 
+def _parse_article_and_comments(parser_cls, html: str, url: str, article_sel, comment_sel):
+    """Executado nos processos auxiliares (PARSE_WORKERS > 1)."""
+    return (
+        parser_cls.parse_article(html, url, article_sel),
+        parser_cls.parse_comments(html, url, comment_sel),
+    )
+
+
+def _months_ago(dt: datetime, months: int) -> datetime:
+    y, m = dt.year, dt.month - months
+    while m <= 0:
+        m += 12
+        y -= 1
+    # Ajusta o dia para o último dia do mês, se necessário
+    last_day = calendar.monthrange(y, m)[1]
+    day = min(dt.day, last_day)
+    return dt.replace(year=y, month=m, day=day)
+
+
+@lru_cache(maxsize=8192)
+def _parse_iso_to_utc(iso_text: str):
+    # Com cache: itens de listagem repetem as mesmas datas; datetime é imutável
+    try:
+        t = iso_text.replace("Z", "+00:00")
+        dt = datetime.fromisoformat(t)
+        if dt.tzinfo is None:
+            dt = dt.replace(tzinfo=timezone.utc)
+        else:
+            dt = dt.astimezone(timezone.utc)
+        return dt
+    except Exception:
+        return None
+
+
+# Artigos por commit no SQLite durante a coleta
+_WRITE_BATCH_SIZE = 100
+
+
+class _ColumnBuffer:
+    """Acumula registros (dicts) já separados por coluna.
+
+    ``to_frame()`` equivale a ``pd.DataFrame(registros)`` (colunas na ordem em
+    que as chaves aparecem; ausentes ficam nulas), mas o pandas recebe listas
+    por coluna e não precisa percorrer um dict por linha.
+    """
+
+    def __init__(self) -> None:
+        self._cols: Dict[str, List] = {}
+        self._n = 0
+
+    def append(self, rec: Dict) -> None:
+        cols, n = self._cols, self._n
+        for k, v in rec.items():
+            col = cols.get(k)
+            if col is None:
+                col = cols[k] = [None] * n
+            col.append(v)
+        self._n = n + 1
+        if len(rec) != len(cols):
+            # Completa as colunas que este registro não tem
+            for col in cols.values():
+                if len(col) == n:
+                    col.append(None)
+
+    def extend(self, recs: Iterable[Dict]) -> None:
+        for rec in recs:
+            self.append(rec)
+
+    def __len__(self) -> int:
+        return self._n
+
+    def to_frame(self) -> pd.DataFrame:
+        return pd.DataFrame(self._cols)
+
+
+class _BackgroundLoop:
+    """Event loop asyncio rodando numa thread auxiliar.
+
+    Permite usar o ``AsyncHttpClient`` a partir do código síncrono (inclusive
+    no Jupyter, que já tem um loop ativo): só as requisições rodam na thread
+    do loop; parsing e SQLite continuam na thread chamadora.
+    """
+
+    def __enter__(self) -> "_BackgroundLoop":
+        self.loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self.loop.run_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def submit(self, coro):
+        """Agenda ``coro`` no loop e devolve um ``concurrent.futures.Future``."""
+        return asyncio.run_coroutine_threadsafe(coro, self.loop)
+
+    def run(self, coro):
+        return self.submit(coro).result()
+
+    def __exit__(self, *exc) -> None:
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self._thread.join()
+        self.loop.close()
+
+
 class Scraper:
     def __init__(self, cfg: Config, client: HttpClient, parser: Parser):
         self.cfg = cfg
@@ -39,30 +147,15 @@ class Scraper:
             db = self._parse_iso_to_utc(self.cfg.date_before)
             if db:
                 self.end_utc = db
+        # Filtro efetivo pré-calculado: [lo, hi) e se datas inválidas reprovam o item
+        if self.start_utc or self.end_utc:
+            self._date_lo, self._date_hi = self.start_utc, self.end_utc
+        else:
+            self._date_lo, self._date_hi = self.cutoff_utc, None
+        self._date_required = bool(self.start_utc or self.end_utc or self.cutoff_utc)
 
-    @staticmethod
-    def _months_ago(dt: datetime, months: int) -> datetime:
-        y, m = dt.year, dt.month - months
-        while m <= 0:
-            m += 12
-            y -= 1
-        # Ajusta o dia para o último dia do mês, se necessário
-        last_day = calendar.monthrange(y, m)[1]
-        day = min(dt.day, last_day)
-        return dt.replace(year=y, month=m, day=day)
-
-    @staticmethod
-    def _parse_iso_to_utc(iso_text: str):
-        try:
-            t = iso_text.replace("Z", "+00:00")
-            dt = datetime.fromisoformat(t)
-            if dt.tzinfo is None:
-                dt = dt.replace(tzinfo=timezone.utc)
-            else:
-                dt = dt.astimezone(timezone.utc)
-            return dt
-        except Exception:
-            return None
+    _months_ago = staticmethod(_months_ago)
+    _parse_iso_to_utc = staticmethod(_parse_iso_to_utc)
 
     def _within_date_filters(self, dt) -> bool:
         """Retorna True se a data dt passa pelos filtros configurados.
@@ -74,16 +167,9 @@ class Scraper:
         """
         if dt is None:
             # Se existem filtros explícitos de data e não conseguimos avaliar, reprovamos o item
-            if self.start_utc or self.end_utc or self.cutoff_utc:
-                return False
-            return True
-        if self.start_utc and dt < self.start_utc:
-            return False
-        if self.end_utc and dt >= self.end_utc:
-            return False
-        if (not self.start_utc and not self.end_utc) and self.cutoff_utc and dt < self.cutoff_utc:
-            return False
-        return True
+            return not self._date_required
+        lo, hi = self._date_lo, self._date_hi
+        return (lo is None or dt >= lo) and (hi is None or dt < hi)
 
     def _sleep(self):
         time.sleep(random.uniform(*self.cfg.delay_range))
@@ -111,28 +197,21 @@ class Scraper:
                     date_selector=self.cfg.listing_date_selector,
                     date_attr=self.cfg.listing_date_attr,
                 )
-                kept = 0
-                page_dts = []
-                for it in items:
-                    diso = it.get("date_iso")
-                    dt = self._parse_iso_to_utc(diso) if diso else None
-                    if dt is not None:
-                        page_dts.append(dt)
-                    if not self._within_date_filters(dt):
-                        continue
-                    all_links.append(it["url"])
-                    kept += 1
+                dts = [
+                    _parse_iso_to_utc(diso) if diso else None
+                    for diso in (it.get("date_iso") for it in items)
+                ]
+                within = self._within_date_filters
+                kept = [it["url"] for it, dt in zip(items, dts) if within(dt)]
+                all_links.extend(kept)
+                page_dts = [dt for dt in dts if dt is not None]
                 # Early-stop heurístico quando listagem é do mais novo → mais antigo
                 # - months_back apenas: se nada passou, paramos (como já estava)
                 # - date_after definido: se o item mais novo da página já é < start, paramos
-                if kept == 0 and (self.cutoff_utc and not (self.start_utc or self.end_utc)):
+                if not kept and (self.cutoff_utc and not (self.start_utc or self.end_utc)):
+                    break
+                if not kept and self.start_utc and page_dts and max(page_dts) < self.start_utc:
                     break
-                if kept == 0 and self.start_utc and page_dts:
-                    try:
-                        if max(page_dts) < self.start_utc:
-                            break
-                    except Exception:
-                        pass
             else:
                 links = self.parser.parse_listing(
                     resp.text,
@@ -142,59 +221,171 @@ class Scraper:
                 all_links.extend(links)
             self._sleep()
 
-        seen = set()
-        unique_links: List[str] = []
-        for u in all_links:
-            if u not in seen:
-                seen.add(u)
-                unique_links.append(u)
-        return unique_links
+        # Remove duplicatas mantendo a ordem de descoberta
+        return list(dict.fromkeys(all_links))
 
-    def scrape_articles(self, links: List[str]) -> tuple[pd.DataFrame, pd.DataFrame]:
-        rows: List[Dict] = []
-        comment_rows: List[Dict] = []
-        for i, url in tqdm(list(enumerate(links, start=1)), total=len(links), desc="Artigos"):
+    def _process_article(
+        self,
+        url: str,
+        resp,
+        rows: _ColumnBuffer,
+        comment_rows: _ColumnBuffer,
+        parsed: Tuple[Dict, List[Dict]] | None = None,
+    ) -> None:
+        """Aplica filtros a um artigo já baixado e persiste o que for selecionado.
+
+        ``parsed``: (artigo, comentários) já extraídos num processo auxiliar.
+        """
+        if resp.status_code != 200:
+            print("Falha artigo", url, resp.status_code)
+            return
+        if parsed is None:
+            html = resp.text
+            item = self.parser.parse_article(html, url, self.cfg.article_sel)
+        else:
+            item, parsed_comments = parsed
+
+        # Filtro por data (DATE_AFTER/DATE_BEFORE têm prioridade; depois months_back)
+        adt = None
+        if item.get("date_iso"):
+            adt = self._parse_iso_to_utc(item["date_iso"])  # type: ignore[arg-type]
+        if not self._within_date_filters(adt):
+            return
+
+        # Verificação do filtro de nomes (título + corpo)
+        combined_text = f"{item.get('title','')}\n{item.get('body','')}"
+        matched, matched_names = self.name_filter.match(combined_text)
+        if not matched:
+            # Ignora artigos que não batem o filtro
+            return
+
+        if matched_names:
+            item["matched_names"] = "; ".join(matched_names)
+        rows.append(item)
+        # Comentários apenas das notícias selecionadas
+        if parsed is None:
+            parsed_comments = self.parser.parse_comments(html, url, self.cfg.comment_sel)
+        comment_rows.extend(parsed_comments)
+        # Persistência incremental no SQLite: artigo, ligação N:N artigo ↔ pessoas
+        # e comentários numa só transação
+        self.storage.ingest_article(item, matched_names, parsed_comments)
+
+    def _fetch_sequential(self, links: List[str]) -> Iterator[Tuple[str, object]]:
+        """Gera (url, resposta ou exceção), uma requisição por vez, com o delay entre elas."""
+        for url in links:
             try:
                 resp = self.client.fetch(url)
-                if resp.status_code != 200:
-                    print("Falha artigo", url, resp.status_code)
-                    continue
-                item = self.parser.parse_article(resp.text, url, self.cfg.article_sel)
-
-                # Filtro por data (DATE_AFTER/DATE_BEFORE têm prioridade; depois months_back)
-                adt = None
-                if item.get("date_iso"):
-                    adt = self._parse_iso_to_utc(item["date_iso"])  # type: ignore[arg-type]
-                if not self._within_date_filters(adt):
-                    continue
-
-                # Verificação do filtro de nomes (título + corpo)
-                combined_text = f"{item.get('title','')}\n{item.get('body','')}"
-                matched, matched_names = self.name_filter.match(combined_text)
-                if not matched:
-                    # Ignora artigos que não batem o filtro
-                    continue
-
-                if matched_names:
-                    item["matched_names"] = "; ".join(matched_names)
-                rows.append(item)
-                # Persistência incremental no SQLite
-                self.storage.upsert_article(item)
-                # Ligação N:N artigo ↔ pessoas
-                if matched_names:
-                    self.storage.link_article_people(item["url"], matched_names)
-
-                # Comentários apenas das notícias selecionadas
-                parsed_comments = self.parser.parse_comments(resp.text, url, self.cfg.comment_sel)
-                comment_rows.extend(parsed_comments)
-                self.storage.upsert_comments(parsed_comments)
             except Exception as e:
-                print("Erro em", url, e)
+                resp = e
+            yield url, resp
+            self._sleep()
+
+    def _fetch_concurrent(self, links: List[str]) -> Iterator[Tuple[str, object]]:
+        """Baixa os artigos em lotes de ``http_concurrency`` requisições simultâneas.
+
+        Gera (url, resposta ou exceção) na ordem de ``links``; o atraso de
+        cortesia é aplicado entre lotes. O download do próximo lote começa
+        antes do processamento do atual (os dois se sobrepõem).
+        """
+        n = self.cfg.http_concurrency
+        chunks = [links[i:i + n] for i in range(0, len(links), n)]
+        with _BackgroundLoop() as bg:
+            client = AsyncHttpClient(self.cfg.headers, max_connections=n)
+            pending = bg.submit(client.fetch_all(chunks[0], concurrency=n)) if chunks else None
+            try:
+                for k, chunk in enumerate(chunks):
+                    results = pending.result()
+                    pending = None
+                    self._sleep()
+                    if k + 1 < len(chunks):
+                        pending = bg.submit(client.fetch_all(chunks[k + 1], concurrency=n))
+                    yield from zip(chunk, results)
             finally:
-                self._sleep()
+                if pending is not None:
+                    pending.cancel()
+                bg.run(client.aclose())
+
+    def _store_article(
+        self,
+        url: str,
+        resp,
+        rows: _ColumnBuffer,
+        comment_rows: _ColumnBuffer,
+        parsed: Future | None = None,
+    ) -> None:
+        """``_process_article`` dentro de um savepoint, com commit a cada lote.
+
+        Erros (download, parsing ou escrita) são reportados e não interrompem a coleta.
+        """
+        try:
+            if isinstance(resp, BaseException):
+                raise resp
+            result = parsed.result() if parsed is not None else None
+            try:
+                with self.storage.savepoint("artigo"):
+                    self._process_article(url, resp, rows, comment_rows, result)
+            finally:
+                self._pending_writes += 1
+                if self._pending_writes >= _WRITE_BATCH_SIZE:
+                    self.storage.flush()
+                    self.storage.begin()
+                    self._pending_writes = 0
+        except Exception as e:
+            print("Erro em", url, e)
+
+    def _store_articles_pooled(self, fetched, bar, rows: _ColumnBuffer, comment_rows: _ColumnBuffer) -> None:
+        """Parsing em ``parse_workers`` processos; filtros e SQLite seguem aqui, em ordem."""
+        workers = self.cfg.parse_workers
+        pending: Deque[Tuple[str, object, Future | None]] = deque()
+
+        def store_ready(limit: int) -> None:
+            # Processa a partir do mais antigo: os que já terminaram ou, se a fila
+            # passou do limite, espera o primeiro (a ordem de ``links`` é mantida)
+            while pending and (len(pending) > limit or pending[0][2] is None or pending[0][2].done()):
+                url, resp, fut = pending.popleft()
+                self._store_article(url, resp, rows, comment_rows, fut)
+                bar.update(1)
+
+        with ProcessPoolExecutor(max_workers=workers) as ex:
+            for url, resp in fetched:
+                fut = None
+                if not isinstance(resp, BaseException) and resp.status_code == 200:
+                    fut = ex.submit(
+                        _parse_article_and_comments,
+                        type(self.parser),
+                        resp.text,
+                        url,
+                        self.cfg.article_sel,
+                        self.cfg.comment_sel,
+                    )
+                pending.append((url, resp, fut))
+                store_ready(2 * workers)
+            store_ready(0)
+
+    def scrape_articles(self, links: List[str]) -> tuple[pd.DataFrame, pd.DataFrame]:
+        rows = _ColumnBuffer()
+        comment_rows = _ColumnBuffer()
+        if self.cfg.http_concurrency > 1:
+            fetched = self._fetch_concurrent(links)
+        else:
+            fetched = self._fetch_sequential(links)
+        # Escritas em lote: um commit a cada _WRITE_BATCH_SIZE artigos (e no fim);
+        # um erro num artigo desfaz só as escritas dele (savepoint)
+        self._pending_writes = 0
+        self.storage.begin()
+        try:
+            with closing(fetched), tqdm(total=len(links), desc="Artigos") as bar:
+                if self.cfg.parse_workers > 1:
+                    self._store_articles_pooled(fetched, bar, rows, comment_rows)
+                else:
+                    for url, resp in fetched:
+                        self._store_article(url, resp, rows, comment_rows)
+                        bar.update(1)
+        finally:
+            self.storage.flush()
 
-        df_articles = pd.DataFrame(rows)
-        df_comments = pd.DataFrame(comment_rows) if comment_rows else pd.DataFrame()
+        df_articles = rows.to_frame()
+        df_comments = comment_rows.to_frame() if comment_rows else pd.DataFrame()
         return df_articles, df_comments
 
     def run(self):
@@ -223,6 +414,11 @@ class Scraper:
 
         links = self.collect_links()
         print(f"Links coletados (únicos): {len(links)}")
+        if self.cfg.skip_existing:
+            known = self.storage.article_urls()
+            new_links = [u for u in links if u not in known]
+            print(f"Já no banco (pulados): {len(links) - len(new_links)}")
+            links = new_links
 
         df_articles, df_comments = self.scrape_articles(links)
 
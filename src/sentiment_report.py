@@ -4,9 +4,10 @@ import csv
 import sqlite3
 from dataclasses import dataclass
 from pathlib import Path
-from typing import Iterable, Tuple, Dict, Tuple as Tup
+from typing import Iterable, List, Tuple, Dict, Tuple as Tup
 
 from .sentiment import TargetedLexiconAnalyzer, normalize, SentimentResult
+from .storage import ensure_report_indexes, tune_read_connection
 
 
 @dataclass
@@ -14,6 +15,8 @@ class SentimentReportConfig:
     db_path: Path = Path("data/rapagem.db")
     out_dir: Path = Path("data/reports")
     out_file: str = "comentarios_por_pessoa_sentimento.csv"
+    # Cria os índices dos joins em bancos antigos (abre o banco para escrita rapidamente)
+    ensure_indexes: bool = False
 
 
 QUERY = """
@@ -53,86 +56,161 @@ def ensure_dir(p: Path) -> None:
     p.mkdir(parents=True, exist_ok=True)
 
 
-def _has_article_reference(text: str) -> bool:
-    t = normalize(text)
-    # Palavras/frases que indicam referência explícita à matéria/notícia/reportagem
-    keys = (
-        "materia",
-        "noticia",
-        "reportagem",
-        "esta materia",
-        "essa materia",
-        "esta noticia",
-        "essa noticia",
-        "esta reportagem",
-        "essa reportagem",
-        "a materia",
-        "a noticia",
-        "a reportagem",
-        "no farol",
-        "do farol",
-    )
-    return any(k in t for k in keys)
+# Palavras/frases que indicam referência explícita à matéria/notícia/reportagem
+_ARTICLE_REF_KEYS = (
+    "materia",
+    "noticia",
+    "reportagem",
+    "esta materia",
+    "essa materia",
+    "esta noticia",
+    "essa noticia",
+    "esta reportagem",
+    "essa reportagem",
+    "a materia",
+    "a noticia",
+    "a reportagem",
+    "no farol",
+    "do farol",
+)
+
+# Primeiro padrões de discordância (para evitar 'nao concordo' casar com 'concordo')
+_DISAGREE_PATTERNS = (
+    "discordo",
+    "nao concordo",
+    "mentira",
+    "e mentira",
+    "isso e mentira",
+    "fake news",
+    "fake",
+    "nao e verdade",
+    "falso",
+    "nao confere",
+    "improcedente",
+    "nao procede",
+    "errado",
+    "nada a ver",
+)
+
+_AGREE_PATTERNS = (
+    "concordo",
+    "concorda",
+    "verdade",
+    "e verdade",
+    "isso e verdade",
+    "confere",
+    "procedente",
+    "ta certo",
+    "esta certo",
+    "correto",
+    "isso mesmo",
+    "bem dito",
+)
+
+
+def _minimal_patterns(pats: Tup[str, ...]) -> Tup[str, ...]:
+    """Remove padrões que contêm outro da mesma lista ("esta materia" ⊃ "materia").
+
+    Para um teste ``any(p in texto ...)`` o resultado é o mesmo, com menos buscas.
+    """
+    uniq = tuple(dict.fromkeys(pats))
+    return tuple(p for p in uniq if not any(q != p and q in p for q in uniq))
+
+
+# Listas efetivamente buscadas (as originais ficam acima, legíveis e editáveis)
+_REF_SCAN = _minimal_patterns(_ARTICLE_REF_KEYS)
+_DISAGREE_SCAN = _minimal_patterns(_DISAGREE_PATTERNS)
+_AGREE_SCAN = _minimal_patterns(_AGREE_PATTERNS)
+
+
+try:  # opcional: as três listas de padrões em uma única passada pelo texto
+    import ahocorasick
+except ImportError:  # pragma: no cover - depende do ambiente
+    ahocorasick = None
+
+# Categorias de cada padrão (bits; um padrão pode estar em mais de uma lista)
+_REF, _DISAGREE, _AGREE = 1, 2, 4
+
+
+def _build_flags_automaton():
+    cats: Dict[str, int] = {}
+    for bit, pats in ((_REF, _REF_SCAN), (_DISAGREE, _DISAGREE_SCAN), (_AGREE, _AGREE_SCAN)):
+        for p in pats:
+            cats[p] = cats.get(p, 0) | bit
+    ac = ahocorasick.Automaton()
+    for p, bits in cats.items():
+        ac.add_word(p, bits)
+    ac.make_automaton()
+    return ac
+
+
+_FLAGS_AC = _build_flags_automaton() if ahocorasick is not None else None
+
 
+def _comment_flags(norm: str) -> Tup[bool, str]:
+    """(referência à matéria, stance) de um texto já normalizado."""
+    if _FLAGS_AC is None:
+        return _has_article_reference(norm), _detect_news_stance(norm)
+    found = 0
+    for _, bits in _FLAGS_AC.iter(norm):
+        found |= bits
+        if found & (_REF | _DISAGREE) == _REF | _DISAGREE:
+            break  # nada mais muda o resultado
+    if found & _DISAGREE:
+        stance = "discorda"
+    elif found & _AGREE:
+        stance = "concorda"
+    else:
+        stance = "indefinido"
+    return bool(found & _REF), stance
 
-def _detect_news_stance(text: str) -> str:
+
+def _has_article_reference(norm: str) -> bool:
+    """``norm``: texto já normalizado (``normalize``)."""
+    return any(k in norm for k in _REF_SCAN)
+
+
+def _detect_news_stance(norm: str) -> str:
     """Detecta se o comentário concorda/discorda da notícia.
 
+    ``norm``: texto já normalizado (``normalize``).
     Retorna: 'concorda' | 'discorda' | 'indefinido'
     """
-    t = normalize(text)
-    # Primeiro padrões de discordância (para evitar 'nao concordo' casar com 'concordo')
-    disagree = (
-        "discordo",
-        "nao concordo",
-        "mentira",
-        "e mentira",
-        "isso e mentira",
-        "fake news",
-        "fake",
-        "nao e verdade",
-        "falso",
-        "nao confere",
-        "improcedente",
-        "nao procede",
-        "errado",
-        "nada a ver",
-    )
-    if any(pat in t for pat in disagree):
+    if any(pat in norm for pat in _DISAGREE_SCAN):
         return "discorda"
-
-    agree = (
-        "concordo",
-        "concorda",
-        "verdade",
-        "e verdade",
-        "isso e verdade",
-        "confere",
-        "procedente",
-        "ta certo",
-        "esta certo",
-        "correto",
-        "isso mesmo",
-        "bem dito",
-    )
-    if any(pat in t for pat in agree):
+    if any(pat in norm for pat in _AGREE_SCAN):
         return "concorda"
-
     return "indefinido"
 
 
+def _target_variants(nome_pessoa: str) -> List[str]:
+    # Nomes-alvo: nome completo e última palavra (sobrenome)
+    target_variants = [nome_pessoa]
+    parts = [p for p in normalize(nome_pessoa).split(" ") if p]
+    if parts:
+        target_variants.append(parts[-1])
+    return target_variants
+
+
+# Linhas por lote nas leituras do SQLite (notícias / comentários)
+_BATCH_SIZE = 1000
+_COMMENT_BATCH_SIZE = 2000
+
+
 def _compute_article_sentiments(cur: sqlite3.Cursor, analyzer: TargetedLexiconAnalyzer) -> Dict[Tup[str, int], SentimentResult]:
+    cur.arraysize = _BATCH_SIZE
     cur.execute(ARTICLE_QUERY)
-    rows = cur.fetchall()
     art_res: Dict[Tup[str, int], SentimentResult] = {}
-    for (id_pessoa, nome_pessoa, artigo_url, titulo, corpo) in rows:
-        target_variants = [nome_pessoa]
-        parts = [p for p in normalize(nome_pessoa).split(" ") if p]
-        if parts:
-            target_variants.append(parts[-1])
-        texto = (titulo or "") + "\n\n" + (corpo or "")
-        res = analyzer.analyze(texto, target_names=target_variants)
-        art_res[(str(artigo_url), int(id_pessoa))] = res
+    # Em lote: a mesma notícia aparece uma vez por pessoa citada e, dentro do
+    # lote, é tokenizada só uma vez (analyze_many)
+    while True:
+        rows = cur.fetchmany()
+        if not rows:
+            break
+        texts = [(titulo or "") + "\n\n" + (corpo or "") for (_, _, _, titulo, corpo) in rows]
+        targets = [_target_variants(nome_pessoa) for (_, nome_pessoa, _, _, _) in rows]
+        for (id_pessoa, _, artigo_url, _, _), res in zip(rows, analyzer.analyze_many(texts, targets)):
+            art_res[(str(artigo_url), int(id_pessoa))] = res
     return art_res
 
 
@@ -173,6 +251,41 @@ def _derive_final_label(
     return "neutro", min(0.5, max(0.25, comment_res.confidence * 0.5)), "indefinido"
 
 
+_OUT_HEADER = [
+    "id_pessoa",
+    "nome_pessoa",
+    "comment_key",
+    "artigo_url",
+    "data_comentario",
+    # análise do comentário (direta)
+    "comentario_sentimento",
+    "comentario_score",
+    "comentario_confianca",
+    "comentario_hits",
+    "alvo_mencionado",
+    "referencia_materia",
+    "stance_noticia",
+    # análise da notícia em relação à pessoa
+    "noticia_sentimento",
+    "noticia_score",
+    "noticia_confianca",
+    "noticia_hits",
+    # rótulo final derivado
+    "sentimento_final",
+    "confianca_final",
+    "origem",
+    # metadados
+    "metodo",
+    "versao",
+]
+
+
+def _person_targets(cur: sqlite3.Cursor) -> Dict[int, List[str]]:
+    """Nomes-alvo de cada pessoa, calculados uma vez (e não por comentário)."""
+    cur.execute("SELECT id, name FROM pessoas")
+    return {int(pid): _target_variants(name) for pid, name in cur}
+
+
 def generate_sentiment_report(cfg: SentimentReportConfig, analyzer: TargetedLexiconAnalyzer | None = None) -> Path:
     analyzer = analyzer or TargetedLexiconAnalyzer()
     ensure_dir(cfg.out_dir)
@@ -180,98 +293,85 @@ def generate_sentiment_report(cfg: SentimentReportConfig, analyzer: TargetedLexi
 
     # Abre em modo somente leitura para evitar criar WAL/journal no sandbox
     abs_path = cfg.db_path.resolve()
+    if cfg.ensure_indexes:
+        wcon = sqlite3.connect(str(abs_path))
+        try:
+            ensure_report_indexes(wcon)
+        finally:
+            wcon.close()
     db_uri = f"file:{abs_path}?mode=ro"
-    con = sqlite3.connect(db_uri, uri=True)
+    con = tune_read_connection(sqlite3.connect(db_uri, uri=True), query_only=True)
     try:
         cur = con.cursor()
         article_map = _compute_article_sentiments(cur, analyzer)
+        person_targets = _person_targets(cur)
+        cur.arraysize = _COMMENT_BATCH_SIZE
         cur.execute(QUERY)
-        rows = cur.fetchall()
-        headers = [d[0] for d in cur.description or []]
 
         with out_path.open("w", newline="", encoding="utf-8") as f:
             w = csv.writer(f)
             # Cabeçalho de saída
-            w.writerow([
-                "id_pessoa",
-                "nome_pessoa",
-                "comment_key",
-                "artigo_url",
-                "data_comentario",
-                # análise do comentário (direta)
-                "comentario_sentimento",
-                "comentario_score",
-                "comentario_confianca",
-                "comentario_hits",
-                "alvo_mencionado",
-                "referencia_materia",
-                "stance_noticia",
-                # análise da notícia em relação à pessoa
-                "noticia_sentimento",
-                "noticia_score",
-                "noticia_confianca",
-                "noticia_hits",
-                # rótulo final derivado
-                "sentimento_final",
-                "confianca_final",
-                "origem",
-                # metadados
-                "metodo",
-                "versao",
-            ])
-
-            for row in rows:
-                (
-                    id_pessoa,
-                    nome_pessoa,
-                    nome_norm,
-                    artigo_url,
-                    titulo_artigo,
-                    data_comentario,
-                    comment_key,
-                    autor,
-                    conteudo,
-                ) = row
-
-                # Nomes-alvo: nome completo e última palavra (sobrenome)
-                target_variants = [nome_pessoa]
-                parts = [p for p in normalize(nome_pessoa).split(" ") if p]
-                if parts:
-                    target_variants.append(parts[-1])
-
-                res = analyzer.analyze(conteudo or "", target_names=target_variants)
-                art_res = article_map.get((str(artigo_url), int(id_pessoa)))
-                ref = _has_article_reference(conteudo or "")
-                stance = _detect_news_stance(conteudo or "")
-                final_label, final_conf, origin = _derive_final_label(res, art_res, res.mentioned, ref, stance)
-
-                w.writerow([
-                    id_pessoa,
-                    nome_pessoa,
-                    comment_key,
-                    artigo_url,
-                    data_comentario,
-                    # comentário base
-                    res.label,
-                    f"{res.score:.4f}",
-                    f"{res.confidence:.3f}",
-                    res.hits,
-                    1 if res.mentioned else 0,
-                    1 if ref else 0,
-                    stance,
-                    # notícia
-                    (art_res.label if art_res else "neutro"),
-                    f"{(art_res.score if art_res else 0.0):.4f}",
-                    f"{(art_res.confidence if art_res else 0.3):.3f}",
-                    (art_res.hits if art_res else 0),
-                    # final derivado
-                    final_label,
-                    f"{final_conf:.3f}",
-                    origin,
-                    # meta
-                    "lexico_v1",
-                    "0.1.0",
-                ])
+            w.writerow(_OUT_HEADER)
+
+            # Leitura em lotes (fetchmany) e uma chamada a writerows por lote
+            while True:
+                rows = cur.fetchmany()
+                if not rows:
+                    break
+                contents = [conteudo or "" for (*_, conteudo) in rows]
+                targets = [
+                    person_targets.get(int(row[0])) or _target_variants(row[1]) for row in rows
+                ]
+                out_rows = []
+                # referência/stance dependem só do texto: uma vez por comentário do lote
+                flags: Dict[str, Tup[bool, str]] = {}
+                for row, conteudo, res in zip(rows, contents, analyzer.analyze_many(contents, targets)):
+                    (
+                        id_pessoa,
+                        nome_pessoa,
+                        nome_norm,
+                        artigo_url,
+                        titulo_artigo,
+                        data_comentario,
+                        comment_key,
+                        autor,
+                        _,
+                    ) = row
+
+                    art_res = article_map.get((str(artigo_url), int(id_pessoa)))
+                    if conteudo not in flags:
+                        flags[conteudo] = _comment_flags(normalize(conteudo))
+                    ref, stance = flags[conteudo]
+                    final_label, final_conf, origin = _derive_final_label(res, art_res, res.mentioned, ref, stance)
+
+                    out_rows.append([
+                        id_pessoa,
+                        nome_pessoa,
+                        comment_key,
+                        artigo_url,
+                        data_comentario,
+                        # comentário base
+                        res.label,
+                        f"{res.score:.4f}",
+                        f"{res.confidence:.3f}",
+                        res.hits,
+                        1 if res.mentioned else 0,
+                        1 if ref else 0,
+                        stance,
+                        # notícia
+                        (art_res.label if art_res else "neutro"),
+                        f"{(art_res.score if art_res else 0.0):.4f}",
+                        f"{(art_res.confidence if art_res else 0.3):.3f}",
+                        (art_res.hits if art_res else 0),
+                        # final derivado
+                        final_label,
+                        f"{final_conf:.3f}",
+                        origin,
+                        # meta
+                        "lexico_v1",
+                        "0.1.0",
+                    ])
+                w.writerows(out_rows)
 
     finally:
         con.close()
@@ -279,8 +379,18 @@ def generate_sentiment_report(cfg: SentimentReportConfig, analyzer: TargetedLexi
     return out_path
 
 
-def aggregate_by_person(source_csv: Path, out_dir: Path) -> Path:
-    out_path = out_dir / "sentimento_agregado_por_pessoa.csv"
+_AGG_COLUMNS = ("id_pessoa", "nome_pessoa", "sentimento_final", "sentimento", "alvo_mencionado")
+
+# (id_pessoa, nome_pessoa, total, pos, neg, neu, menções), na ordem de saída
+_PersonCounts = Tup[str, str, int, int, int, int, int]
+
+
+def _sorted_counts(items: Iterable[_PersonCounts]) -> List[_PersonCounts]:
+    # Mais citados primeiro; empate pelo nome (sort estável: ordem de aparição)
+    return sorted(items, key=lambda c: (-c[2], c[1]))
+
+
+def _count_by_person_csv(source_csv: Path) -> List[_PersonCounts]:
     counts: dict[tuple[str, str], dict[str, float]] = {}
     with source_csv.open("r", encoding="utf-8") as f:
         r = csv.DictReader(f)
@@ -300,6 +410,52 @@ def aggregate_by_person(source_csv: Path, out_dir: Path) -> Path:
             d["total"] += 1
             if row.get("alvo_mencionado") in ("1", 1):
                 d["mention"] += 1
+    return _sorted_counts(
+        (pid, pname, d["total"], d["pos"], d["neg"], d["neu"], d["mention"])
+        for (pid, pname), d in counts.items()
+    )
+
+
+def _count_by_person_pandas(pd, source_csv: Path) -> List[_PersonCounts]:
+    # Tudo como texto (sem NaN): mesmas regras do caminho com csv.DictReader
+    df = pd.read_csv(
+        source_csv,
+        usecols=lambda c: c in _AGG_COLUMNS,
+        dtype=str,
+        keep_default_na=False,
+        encoding="utf-8",
+    )
+    if df.empty:
+        return []
+    lab = pd.Series("", index=df.index)
+    for col in ("sentimento_final", "sentimento"):  # primeiro valor não vazio
+        if col in df:
+            lab = lab.where(lab != "", df[col])
+    mention = df["alvo_mencionado"] == "1" if "alvo_mencionado" in df else False
+    flags = pd.DataFrame({
+        "id_pessoa": df["id_pessoa"],
+        "nome_pessoa": df["nome_pessoa"],
+        "total": 1,
+        "pos": lab == "positivo",
+        "neg": lab == "negativo",
+        "mention": mention,
+    })
+    g = flags.groupby(["id_pessoa", "nome_pessoa"], sort=False).sum()
+    neu = g["total"] - g["pos"] - g["neg"]
+    return _sorted_counts(
+        (pid, pname, int(t), int(p), int(n), int(u), int(m))
+        for (pid, pname), t, p, n, u, m in zip(g.index, g["total"], g["pos"], g["neg"], neu, g["mention"])
+    )
+
+
+def aggregate_by_person(source_csv: Path, out_dir: Path) -> Path:
+    out_path = out_dir / "sentimento_agregado_por_pessoa.csv"
+    try:
+        import pandas as pd  # agregação vetorizada quando disponível
+    except ImportError:  # pragma: no cover - depende do ambiente
+        counts = _count_by_person_csv(source_csv)
+    else:
+        counts = _count_by_person_pandas(pd, source_csv)
 
     with out_path.open("w", newline="", encoding="utf-8") as f:
         w = csv.writer(f)
@@ -315,19 +471,19 @@ def aggregate_by_person(source_csv: Path, out_dir: Path) -> Path:
             "pct_neu",
             "pct_mencao_direta",
         ])
-        for (pid, pname), d in sorted(counts.items(), key=lambda kv: (-kv[1]["total"], kv[0][1])):
-            tot = max(1.0, float(d["total"]))
+        for pid, pname, total, pos, neg, neu, mention in counts:
+            tot = max(1.0, float(total))
             w.writerow([
                 pid,
                 pname,
-                int(d["total"]),
-                int(d["pos"]),
-                int(d["neg"]),
-                int(d["neu"]),
-                f"{(d['pos']/tot):.3f}",
-                f"{(d['neg']/tot):.3f}",
-                f"{(d['neu']/tot):.3f}",
-                f"{(d['mention']/tot):.3f}",
+                total,
+                pos,
+                neg,
+                neu,
+                f"{(pos/tot):.3f}",
+                f"{(neg/tot):.3f}",
+                f"{(neu/tot):.3f}",
+                f"{(mention/tot):.3f}",
             ])
 
     return out_path
@@ -1,29 +1,311 @@
 from __future__ import annotations
 
 import hashlib
+import json
+import os
+import queue
 import sqlite3
-import unicodedata
+import time
+from collections import Counter
+from contextlib import contextmanager
 from dataclasses import dataclass
+from functools import lru_cache
+from itertools import islice
 from pathlib import Path
-from typing import Iterable, Dict, List
+from typing import Iterable, Dict, List, Optional, Set
+
+from .textnorm import normalize as _normalize
+
+
+# Pragmas de leitura (relatórios/exportações): mmap de 256 MiB, cache de
+# 64 MiB e temporários em memória. journal_mode/synchronous ficam a cargo do
+# SQLiteStorage (escrita): o WAL é persistente no arquivo e não precisa ser
+# reaplicado por conexões que só leem.
+_READ_PRAGMAS = (
+    "PRAGMA mmap_size=268435456;"
+    "PRAGMA cache_size=-65536;"
+    "PRAGMA temp_store=MEMORY;"
+)
+
+
+def tune_read_connection(con: sqlite3.Connection, *, query_only: bool = False) -> sqlite3.Connection:
+    con.executescript(_READ_PRAGMAS)
+    if query_only:
+        # Recusa qualquer escrita (inclusive em tabelas TEMP)
+        con.execute("PRAGMA query_only=1;")
+    return con
+
+
+# Índices das consultas de relatório: (article_url, person_id) já é coberto pela
+# PK de artigos_pessoas; o inverso atende joins/agrupamentos por pessoa.
+_REPORT_INDEXES = (
+    "CREATE INDEX IF NOT EXISTS idx_comentarios_artigo ON comentarios(article_url);"
+    "CREATE INDEX IF NOT EXISTS idx_ap_pessoa ON artigos_pessoas(person_id, article_url);"
+    "CREATE INDEX IF NOT EXISTS idx_artigos_scraped ON artigos(scraped_at);"
+)
+
+
+def ensure_report_indexes(con: sqlite3.Connection) -> None:
+    """Cria (se faltarem) os índices usados pelos relatórios; exige conexão de escrita."""
+    con.executescript(_REPORT_INDEXES)
+
+
+@lru_cache(maxsize=4096)
+def _norm(text: str) -> str:
+    # Com cache: os mesmos nomes se repetem em milhares de artigos.
+    # Mesma normalização do NameFilter (NFKD sem marcas combinantes, minúsculas,
+    # espaços colapsados), que remove as marcas em C (str.replace por marca).
+    # Sem acentos de propósito: name_norm é a chave UNIQUE de pessoas e o filtro
+    # casa "José" com "Jose"; trocar por NFC/casefold separaria pessoas já
+    # gravadas e as ligações deixariam de casar com o que o filtro encontrou.
+    return _normalize(text) if text else ""
+
+
+def _hash_key(article_url: str | None, content: str | None) -> str:
+    """Chave de comentário sem id/permalink: SHA-1 de article_url + "\n" + conteúdo.
+
+    Mantém SHA-1 (trocar o algoritmo mudaria as chaves já gravadas e duplicaria
+    comentários); as partes entram por update(), sem montar a string concatenada.
+    """
+    h = hashlib.sha1((article_url or "").encode("utf-8"))
+    h.update(b"\n")
+    h.update((content or "").encode("utf-8"))
+    return h.hexdigest()
+
+
+def _content_hash(*parts: str | None) -> bytes:
+    """BLAKE2b-128 dos campos do artigo; cada parte com tamanho prefixado (None ≠ "")."""
+    h = hashlib.blake2b(digest_size=16)
+    for part in parts:
+        if part is None:
+            h.update(b"\xff")
+        else:
+            b = part.encode("utf-8")
+            h.update(len(b).to_bytes(8, "little"))
+            h.update(b)
+    return h.digest()
+
+
+# RETURNING (SQLite >= 3.35): ids de um upsert multi-linha sem SELECT extra
+_HAS_RETURNING = sqlite3.sqlite_version_info >= (3, 35, 0)
+# Pessoas por INSERT (2 parâmetros por linha; limite antigo de 999 variáveis)
+_PEOPLE_CHUNK = 250
+# PRAGMA user_version a partir do qual a migração EN -> PT-BR já foi feita
+_MIGRATED_VERSION = 1
+# ... e a partir do qual artigos não tem mais a coluna matched_names
+_NO_MATCHED_NAMES_VERSION = 2
+# ... e a partir do qual artigos tem a coluna content_hash
+_CONTENT_HASH_VERSION = 3
+# Versão do schema criado por _create_schema (a última migração)
+_CURRENT_SCHEMA_VERSION = _CONTENT_HASH_VERSION
+# Comentários por executemany em upsert_comments
+_COMMENT_CHUNK = 1000
+# Nomes por INSERT ... SELECT de ligações (1 parâmetro cada, mais a URL)
+_LINK_CHUNK = 900
+
+
+# SQL dos upserts frequentes: strings fixas, reaproveitadas pelo cache de
+# statements da conexão (sem recompilar a cada chamada)
+_SQL_UPSERT_ARTIGO = """
+INSERT INTO artigos (url, title, body, date, content_hash)
+VALUES (?, ?, ?, ?, ?)
+ON CONFLICT(url) DO UPDATE SET
+    title=excluded.title,
+    body=excluded.body,
+    date=excluded.date,
+    content_hash=excluded.content_hash,
+    updated_at=CURRENT_TIMESTAMP
+-- Re-coleta sem mudança: nenhuma linha é reescrita (nem updated_at)
+WHERE artigos.content_hash IS NOT excluded.content_hash;
+"""
+_SQL_UPSERT_PESSOA = """
+INSERT INTO pessoas (name, name_norm)
+VALUES (?, ?)
+ON CONFLICT(name_norm) DO UPDATE SET
+    name=excluded.name,
+    updated_at=CURRENT_TIMESTAMP;
+"""
+# id é INTEGER PRIMARY KEY (o próprio rowid), que todo índice já guarda: o índice
+# UNIQUE de name_norm cobre esta busca (COVERING INDEX), sem índice (name_norm, id)
+_SQL_SELECT_PESSOA_ID = "SELECT id FROM pessoas WHERE name_norm = ?"
+_SQL_COMENT_INSERT = """
+INSERT INTO comentarios (
+    comment_key, article_url, comment_id, author, time_text, time_iso, content, permalink
+) VALUES
+"""
+# Uma linha de VALUES; parâmetros a partir de ?{b}: article_url, comment_id, author,
+# time_text, time_iso, content, permalink. Chave: comment_id, senão permalink,
+# senão cmt_key (hash, ver _hash_key)
+_COMENT_ROW = (
+    "(COALESCE(NULLIF(?{cid}, ''), NULLIF(?{pl}, ''), cmt_key(?{url}, ?{content})), "
+    "?{url}, ?{cid}, ?{author}, ?{tt}, ?{ti}, ?{content}, ?{pl})"
+)
+_SQL_COMENT_ON_CONFLICT = """
+ON CONFLICT(comment_key) DO UPDATE SET
+    article_url=excluded.article_url,
+    comment_id=excluded.comment_id,
+    author=excluded.author,
+    time_text=excluded.time_text,
+    time_iso=excluded.time_iso,
+    content=excluded.content,
+    permalink=excluded.permalink,
+    updated_at=CURRENT_TIMESTAMP;
+"""
+# Parâmetros por comentário e comentários por INSERT (7 x 120 = 840 < 999 variáveis)
+_COMENT_PARAMS = 7
+_COMENT_ROWS_PER_INSERT = 120
+
+
+@lru_cache(maxsize=None)
+def _comment_upsert_sql(n: int) -> str:
+    """INSERT multi-linha com ``n`` comentários (gerado uma vez por tamanho)."""
+    rows = []
+    for i in range(n):
+        b = i * _COMENT_PARAMS
+        rows.append(
+            _COMENT_ROW.format(
+                url=b + 1, cid=b + 2, author=b + 3, tt=b + 4, ti=b + 5, content=b + 6, pl=b + 7
+            )
+        )
+    return _SQL_COMENT_INSERT + ",\n".join(rows) + _SQL_COMENT_ON_CONFLICT
+
+
+@lru_cache(maxsize=None)
+def _people_upsert_sql(n: int, returning: bool) -> str:
+    """Upsert multi-linha de ``n`` pessoas (gerado uma vez por tamanho)."""
+    return (
+        "INSERT INTO pessoas (name, name_norm) VALUES "
+        + ", ".join(["(?, ?)"] * n)
+        + """
+        ON CONFLICT(name_norm) DO UPDATE SET
+            name=excluded.name,
+            updated_at=CURRENT_TIMESTAMP
+        """
+        + ("RETURNING id, name_norm;" if returning else ";")
+    )
+
+
+@lru_cache(maxsize=None)
+def _link_people_sql(n: int) -> str:
+    """Ligações artigo ↔ ``n`` pessoas (por name_norm) num INSERT ... SELECT.
+
+    CROSS JOIN fixa VALUES como laço externo: as linhas entram na ordem dos nomes.
+    """
+    return (
+        "INSERT OR IGNORE INTO artigos_pessoas (article_url, person_id) "
+        "SELECT ?, p.id FROM (VALUES "
+        + ", ".join(["(?)"] * n)
+        + ") AS v CROSS JOIN pessoas AS p ON p.name_norm = v.column1;"
+    )
+
+
+# Statements preparados mantidos por conexão (padrão do sqlite3: 128)
+_CACHED_STATEMENTS = 256
+
+
+def _sql_key(sql: str) -> str:
+    # Agrupa pelo início do SQL, com espaços colapsados
+    return " ".join(sql.split())[:60]
+
+
+class _SQLProfiler:
+    """Contagem e tempo acumulado por SQL (SQLITE_PROFILE=1), gravados em JSON no ``close()``."""
+
+    def __init__(self) -> None:
+        self.calls: Counter = Counter()  # chamadas a execute/executemany
+        self.ns: Counter = Counter()  # tempo dessas chamadas (perf_counter_ns)
+        # Statements executados de fato (trace callback: cada linha de um executemany,
+        # BEGIN/COMMIT implícitos). O SQL chega com os valores já expandidos, então
+        # agrupa só pelas três primeiras palavras (ex.: "INSERT INTO comentarios").
+        self.statements: Counter = Counter()
+
+    def trace(self, sql: str) -> None:
+        self.statements[" ".join(sql.split()[:3])] += 1
+
+    def timed(self, fn, sql: str, *args):
+        t0 = time.perf_counter_ns()
+        try:
+            return fn(sql, *args)
+        finally:
+            key = _sql_key(sql)
+            self.calls[key] += 1
+            self.ns[key] += time.perf_counter_ns() - t0
+
+    def dump(self, path: Path) -> Path:
+        data = {
+            "calls": [
+                {"sql": k, "calls": self.calls[k], "total_ms": round(self.ns[k] / 1e6, 3)}
+                for k in sorted(self.calls, key=lambda k: -self.ns[k])
+            ],
+            "statements": dict(self.statements.most_common()),
+        }
+        path.write_text(json.dumps(data, ensure_ascii=False, indent=2), encoding="utf-8")
+        return path
+
+
+class _ProfiledConnection:
+    """Repassa tudo à conexão real, medindo ``execute``/``executemany``."""
+
+    def __init__(self, conn: sqlite3.Connection, profiler: _SQLProfiler) -> None:
+        self._conn = conn
+        self._profiler = profiler
+
+    def execute(self, sql: str, *args):
+        return self._profiler.timed(self._conn.execute, sql, *args)
+
+    def executemany(self, sql: str, *args):
+        return self._profiler.timed(self._conn.executemany, sql, *args)
+
+    def __getattr__(self, name: str):
+        return getattr(self._conn, name)
 
 
 @dataclass
 class SQLiteStorage:
     db_path: Path
+    # Cache de páginas e janela de mmap da conexão de escrita, em MiB (0 desativa o mmap)
+    cache_mb: int = 64
+    mmap_mb: int = 256
 
     def __post_init__(self):
-        self.conn = sqlite3.connect(self.db_path)
+        self.conn = sqlite3.connect(self.db_path, cached_statements=_CACHED_STATEMENTS)
+        # Chave de fallback dos comentários calculada dentro do INSERT
+        self.conn.create_function("cmt_key", 2, _hash_key, deterministic=True)
+        # Perfil opcional dos SQL (SQLITE_PROFILE=1): sem custo quando desligado
+        self._profiler = None
+        if os.environ.get("SQLITE_PROFILE", "").strip() not in ("", "0"):
+            self._profiler = _SQLProfiler()
+            self.conn.set_trace_callback(self._profiler.trace)
+            self.conn = _ProfiledConnection(self.conn, self._profiler)
         self.conn.execute("PRAGMA journal_mode=WAL;")
         self.conn.execute("PRAGMA synchronous=NORMAL;")
+        # As FKs ficam ligadas de propósito: cada checagem é uma busca pela PK do pai
         self.conn.execute("PRAGMA foreign_keys=ON;")
-        # Migração: renomear/copiar tabelas para nomes em pt-BR
-        self._migrate_table_names()
-        # Garante o schema com novos nomes
-        self._create_schema()
+        self.conn.execute("PRAGMA temp_store=MEMORY;")
+        # Depois do WAL: cache maior, mmap e checkpoints menos frequentes na ingestão
+        self.conn.execute(f"PRAGMA cache_size=-{max(0, int(self.cache_mb)) * 1024};")
+        self.conn.execute(f"PRAGMA mmap_size={max(0, int(self.mmap_mb)) * 1024 * 1024};")
+        self.conn.execute("PRAGMA wal_autocheckpoint=10000;")
+        # Em lote (begin/flush), os upserts não fazem commit individualmente
+        self._batch = False
+        # Conexões somente leitura (abertas sob demanda por ``read()``)
+        self._readers: "queue.SimpleQueue[sqlite3.Connection]" = queue.SimpleQueue()
+        self._all_readers: List[sqlite3.Connection] = []
+        # Schema já na versão atual: sem DDL nem migrações a cada conexão
+        if self.conn.execute("PRAGMA user_version").fetchone()[0] < _CURRENT_SCHEMA_VERSION:
+            # Garante o schema com novos nomes (antes da migração, que copia para ele)
+            self._create_schema()
+            # Migração: renomear/copiar tabelas para nomes em pt-BR
+            self._migrate_table_names()
+            # Migração: nomes citados só em artigos_pessoas (sem matched_names)
+            self._drop_matched_names()
+            # Migração: content_hash para pular upserts de artigos sem mudança
+            self._add_content_hash()
 
     def _create_schema(self):
         cur = self.conn.cursor()
+        # Banco novo (sem tabelas) já nasce no schema atual: nada a migrar
+        fresh = cur.execute("SELECT 1 FROM sqlite_master WHERE type='table' LIMIT 1").fetchone() is None
         cur.execute(
             """
             CREATE TABLE IF NOT EXISTS artigos (
@@ -31,7 +313,7 @@ class SQLiteStorage:
                 title TEXT,
                 body TEXT,
                 date TEXT,
-                matched_names TEXT,
+                content_hash BLOB,
                 scraped_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
                 updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
             );
@@ -77,19 +359,98 @@ class SQLiteStorage:
             );
             """
         )
-        cur.execute("CREATE INDEX IF NOT EXISTS idx_comentarios_artigo ON comentarios(article_url);")
         self.conn.commit()
+        ensure_report_indexes(self.conn)
+        if fresh:
+            self.conn.execute(f"PRAGMA user_version = {_CURRENT_SCHEMA_VERSION}")
+
+    # ----------------
+    # Transações em lote
+    # ----------------
+    def begin(self) -> None:
+        """Abre uma transação de lote; os upserts só são gravados em ``flush()``."""
+        if not self._batch:
+            self.conn.execute("BEGIN IMMEDIATE")
+            self._batch = True
+
+    def flush(self) -> None:
+        """Confirma a transação de lote aberta por ``begin()`` (um único commit)."""
+        if self._batch:
+            self.conn.commit()
+            self._batch = False
+
+    @contextmanager
+    def savepoint(self, name: str = "item"):
+        """Agrupa as escritas de um item: em caso de erro, desfaz só esse item.
+
+        Só tem efeito dentro de ``begin()``/``flush()``; fora do lote cada
+        upsert já faz o próprio commit.
+        """
+        if not self._batch:
+            yield
+            return
+        self.conn.execute(f"SAVEPOINT {name}")
+        try:
+            yield
+        except BaseException:
+            self.conn.execute(f"ROLLBACK TO {name}")
+            self.conn.execute(f"RELEASE {name}")
+            raise
+        self.conn.execute(f"RELEASE {name}")
+
+    @contextmanager
+    def transaction(self, name: str = "tx"):
+        """Uma transação explícita (BEGIN IMMEDIATE ... COMMIT) para várias escritas.
+
+        Dentro de ``begin()``/``flush()`` (ou de outra ``transaction()``) vira um
+        savepoint: em caso de erro desfaz só o bloco, e o commit fica para o lote.
+        """
+        if self._batch:
+            with self.savepoint(name):
+                yield self.conn
+            return
+        self.begin()
+        try:
+            yield self.conn
+        except BaseException:
+            self._batch = False
+            self.conn.rollback()
+            raise
+        self.flush()
+
+    @contextmanager
+    def ingest_bulk(self, *, check: bool = True):
+        """Ingestão em massa numa transação, com as FKs desligadas.
+
+        As escritas do scraper referenciam linhas válidas por construção; sem FKs,
+        cada insert em artigos_pessoas/comentarios deixa de sondar as tabelas pai.
+        Com ``check``, ``PRAGMA foreign_key_check`` roda antes do COMMIT e uma
+        violação desfaz tudo (``sqlite3.IntegrityError``). O PRAGMA foreign_keys
+        não tem efeito dentro de uma transação: aqui é preciso começar fora dela.
+        """
+        if self._batch or self.conn.in_transaction:
+            raise RuntimeError("ingest_bulk() precisa começar fora de uma transação")
+        self.conn.execute("PRAGMA foreign_keys=OFF;")
+        try:
+            with self.transaction("bulk"):
+                yield self
+                if check:
+                    bad = self.conn.execute("PRAGMA foreign_key_check;").fetchmany(5)
+                    if bad:
+                        raise sqlite3.IntegrityError(f"FOREIGN KEY inválida após ingestão: {bad}")
+        finally:
+            self.conn.execute("PRAGMA foreign_keys=ON;")
+
+    def _commit(self) -> None:
+        # Invariante: os upsert_* só confirmam quando chamados fora de uma
+        # transação (begin()/transaction()); dentro dela o commit é do chamador.
+        if not self._batch:
+            self.conn.commit()
 
     # ----------------
     # People helpers
     # ----------------
-    @staticmethod
-    def _norm(text: str) -> str:
-        if not text:
-            return ""
-        t = unicodedata.normalize("NFKD", text)
-        t = "".join(ch for ch in t if not unicodedata.combining(ch))
-        return " ".join(t.lower().split())
+    _norm = staticmethod(_norm)
 
     def upsert_person(self, name: str) -> int:
         name = (name or "").strip()
@@ -97,129 +458,202 @@ class SQLiteStorage:
             return 0
         nn = self._norm(name)
         self.conn.execute(
-            """
-            INSERT INTO pessoas (name, name_norm)
-            VALUES (:name, :name_norm)
-            ON CONFLICT(name_norm) DO UPDATE SET
-                name=excluded.name,
-                updated_at=CURRENT_TIMESTAMP;
-            """,
-            {"name": name, "name_norm": nn},
+            _SQL_UPSERT_PESSOA,
+            (name, nn),
         )
-        cur = self.conn.execute("SELECT id FROM pessoas WHERE name_norm = ?", (nn,))
+        cur = self.conn.execute(_SQL_SELECT_PESSOA_ID, (nn,))
         row = cur.fetchone()
         return int(row[0]) if row else 0
 
+    def _person_pairs(self, names: Iterable[str]) -> List[tuple]:
+        """(nome, name_norm) dos nomes não vazios, na ordem recebida."""
+        return [(n, self._norm(n)) for n in (x.strip() for x in names if x) if n]
+
+    def _upsert_people(self, pairs: List[tuple], *, returning: bool = False) -> Dict[str, int]:
+        """Upsert multi-linha de ``pairs``; com ``returning``, devolve name_norm -> id.
+
+        Grafias repetidas (mesmo name_norm) não são deduplicadas: o SQLite aplica
+        as linhas em ordem, como upserts em sequência (mesma grafia final e mesmos
+        ids, inclusive os consumidos em conflitos).
+        """
+        by_norm: Dict[str, int] = {}
+        for i in range(0, len(pairs), _PEOPLE_CHUNK):
+            chunk = pairs[i:i + _PEOPLE_CHUNK]
+            cur = self.conn.execute(
+                _people_upsert_sql(len(chunk), returning),
+                [v for pair in chunk for v in pair],
+            )
+            if returning:
+                by_norm.update((nn, pid) for pid, nn in cur.fetchall())
+        return by_norm
+
     def ensure_people(self, names: Iterable[str]) -> List[int]:
-        ids: List[int] = []
-        for n in names:
-            pid = self.upsert_person(n)
-            if pid:
-                ids.append(pid)
-        return ids
+        pairs = self._person_pairs(names)
+        if not _HAS_RETURNING:
+            ids: List[int] = []
+            for n, _ in pairs:
+                pid = self.upsert_person(n)
+                if pid:
+                    ids.append(pid)
+            return ids
+        by_norm = self._upsert_people(pairs, returning=True)
+        return [by_norm[nn] for _, nn in pairs]
 
     def link_article_people(self, article_url: str, names: Iterable[str]):
-        ids = self.ensure_people(names)
-        if not ids:
+        pairs = self._person_pairs(names)
+        if not pairs:
             return
-        payload = [(article_url, pid) for pid in ids]
-        self.conn.executemany(
-            """
-            INSERT OR IGNORE INTO artigos_pessoas (article_url, person_id)
-            VALUES (?, ?);
-            """,
-            payload,
-        )
-        self.conn.commit()
+        self._upsert_people(pairs)
+        # Ligações direto de pessoas, sem trazer os ids para o Python
+        norms = [nn for _, nn in pairs]
+        for i in range(0, len(norms), _LINK_CHUNK):
+            chunk = norms[i:i + _LINK_CHUNK]
+            self.conn.execute(_link_people_sql(len(chunk)), (article_url, *chunk))
+        self._commit()
 
-    def close(self):
+    @contextmanager
+    def read(self):
+        """Empresta uma conexão somente leitura (``mode=ro``) do pool.
+
+        ``self.conn`` é a única conexão de escrita; as leituras longas (relatórios,
+        varreduras) usam estas e, com WAL, não bloqueiam nem esperam a ingestão.
+        Leituras dentro de uma transação aberta devem usar ``self.conn``: só ela
+        enxerga as escritas ainda não confirmadas. Banco em memória: usa ``self.conn``.
+        """
+        if str(self.db_path) == ":memory:":
+            yield self.conn
+            return
         try:
-            self.conn.close()
-        except Exception:
-            pass
+            con = self._readers.get_nowait()
+        except queue.Empty:
+            uri = f"{Path(self.db_path).resolve().as_uri()}?mode=ro"
+            con = tune_read_connection(
+                sqlite3.connect(uri, uri=True, check_same_thread=False), query_only=True
+            )
+            self._all_readers.append(con)
+        try:
+            yield con
+        finally:
+            self._readers.put(con)
+
+    def names_for_article(self, article_url: str) -> List[str]:
+        """Pessoas ligadas ao artigo, na ordem em que foram ligadas.
+
+        Substitui a antiga coluna ``artigos.matched_names`` (grafia atual em ``pessoas``).
+        """
+        return [
+            name
+            for (name,) in self.conn.execute(
+                "SELECT p.name FROM artigos_pessoas ap JOIN pessoas p ON p.id = ap.person_id "
+                "WHERE ap.article_url = ? ORDER BY ap.rowid",
+                (article_url,),
+            )
+        ]
+
+    def article_urls(self) -> Set[str]:
+        """URLs de todos os artigos já gravados (para pular na coleta incremental)."""
+        with self.read() as con:
+            return {u for (u,) in con.execute("SELECT url FROM artigos")}
+
+    def optimize(self) -> None:
+        """Atualiza as estatísticas do planejador (ANALYZE só onde for útil)."""
+        self.conn.execute("PRAGMA optimize;")
+
+    def close(self) -> Optional[Path]:
+        """Fecha as conexões; com SQLITE_PROFILE, retorna o caminho do perfil gravado."""
+        for con in self._all_readers:
+            try:
+                con.close()
+            except Exception:
+                pass
+        self._all_readers.clear()
+        try:
+            # Único ponto do PRAGMA optimize; um erro (ex.: banco travado) sobe ao chamador
+            self.optimize()
+        finally:
+            try:
+                self.conn.close()
+            except Exception:
+                pass
+        if self._profiler is not None:
+            name = "profile.json"
+            path = Path(name) if str(self.db_path) == ":memory:" else Path(self.db_path).parent / name
+            return self._profiler.dump(path)
+        return None
 
     # ---------------
     # Upserts
     # ---------------
     def upsert_article(self, item: Dict):
         self.conn.execute(
-            """
-            INSERT INTO artigos (url, title, body, date, matched_names)
-            VALUES (:url, :title, :body, :date, :matched_names)
-            ON CONFLICT(url) DO UPDATE SET
-                title=excluded.title,
-                body=excluded.body,
-                date=excluded.date,
-                matched_names=excluded.matched_names,
-                updated_at=CURRENT_TIMESTAMP;
-            """,
-            {
-                "url": item.get("url"),
-                "title": item.get("title"),
-                "body": item.get("body"),
-                "date": item.get("date"),
-                "matched_names": item.get("matched_names"),
-            },
+            _SQL_UPSERT_ARTIGO,
+            (
+                item.get("url"),
+                item.get("title"),
+                item.get("body"),
+                item.get("date"),
+                _content_hash(item.get("title"), item.get("body"), item.get("date")),
+            ),
         )
-        self.conn.commit()
+        self._commit()
+
+    def ingest_article(
+        self,
+        item: Dict,
+        names: Iterable[str] | None = None,
+        comments: Iterable[Dict] | None = None,
+    ) -> None:
+        """Artigo, pessoas citadas e comentários numa única transação (um commit)."""
+        with self.transaction("artigo"):
+            self.upsert_article(item)
+            if names:
+                self.link_article_people(item["url"], names)
+            if comments:
+                self.upsert_comments(comments)
 
     def _comment_key(self, row: Dict) -> str:
-        cid = row.get("comment_id") or ""
-        if cid:
-            return cid
-        pl = row.get("permalink") or ""
-        if pl:
-            return pl
-        # Fallback: hash de article_url + conteúdo
-        h = hashlib.sha1()
-        h.update(((row.get("article_url") or "") + "\n" + (row.get("content") or "")).encode("utf-8"))
-        return h.hexdigest()
+        g = row.get
+        return g("comment_id") or g("permalink") or _hash_key(g("article_url"), g("content"))
 
     def upsert_comments(self, rows: Iterable[Dict]):
-        rows = list(rows)
-        if not rows:
-            return
-        payload = []
-        for r in rows:
-            payload.append(
-                {
-                    "comment_key": self._comment_key(r),
-                    "article_url": r.get("article_url"),
-                    "comment_id": r.get("comment_id"),
-                    "author": r.get("author"),
-                    "time_text": r.get("time_text"),
-                    "time_iso": r.get("time_iso"),
-                    "content": r.get("content"),
-                    "permalink": r.get("permalink"),
-                }
-            )
-
-        self.conn.executemany(
-            """
-            INSERT INTO comentarios (
-                comment_key, article_url, comment_id, author, time_text, time_iso, content, permalink
-            ) VALUES (
-                :comment_key, :article_url, :comment_id, :author, :time_text, :time_iso, :content, :permalink
-            )
-            ON CONFLICT(comment_key) DO UPDATE SET
-                article_url=excluded.article_url,
-                comment_id=excluded.comment_id,
-                author=excluded.author,
-                time_text=excluded.time_text,
-                time_iso=excluded.time_iso,
-                content=excluded.content,
-                permalink=excluded.permalink,
-                updated_at=CURRENT_TIMESTAMP;
-            """,
-            payload,
-        )
-        self.conn.commit()
+        # Consome ``rows`` em blocos (islice): memória constante por bloco, mesmo
+        # com um iterador grande; tudo na mesma transação, com um commit no fim
+        it = iter(rows)
+        wrote = False
+        while True:
+            chunk = list(islice(it, _COMMENT_CHUNK))
+            if not chunk:
+                break
+            # Uma linha por comentário: a última ocorrência vence (como o ON CONFLICT
+            # DO UPDATE faria), na posição da primeira (mesma ordem de inserção).
+            # A chave final (com o hash) é calculada no próprio SQL; aqui basta
+            # identificar repetições, sem hash. Parâmetros na ordem de _COMENT_ROW.
+            by_key: Dict[object, tuple] = {}
+            for r in chunk:
+                g = r.get
+                cid, pl = g("comment_id"), g("permalink")
+                url, content = g("article_url"), g("content")
+                by_key[cid or pl or (url or "", content or "")] = (
+                    url, cid, g("author"), g("time_text"), g("time_iso"), content, pl
+                )
+            # Um INSERT multi-linha por grupo: o lote atravessa a VDBE de uma vez,
+            # sem um bind/step por linha como no executemany
+            payload = list(by_key.values())
+            for j in range(0, len(payload), _COMENT_ROWS_PER_INSERT):
+                group = payload[j:j + _COMENT_ROWS_PER_INSERT]
+                self.conn.execute(_comment_upsert_sql(len(group)), [v for row in group for v in row])
+            wrote = True
+        if wrote:
+            self._commit()
 
     # ---------------
     # Migração de nomes das tabelas (EN -> PT-BR)
     # ---------------
     def _migrate_table_names(self) -> None:
         cur = self.conn.cursor()
+        # Já migrado? (user_version é gravado no mesmo COMMIT da cópia)
+        if cur.execute("PRAGMA user_version").fetchone()[0] >= _MIGRATED_VERSION:
+            return
 
         def table_exists(name: str) -> bool:
             r = cur.execute(
@@ -234,9 +668,6 @@ class SQLiteStorage:
             ("article_people", "artigos_pessoas"),
         ]
 
-        # Garante as novas tabelas antes de copiar (idempotente)
-        self._create_schema()
-
         # Copia dados na ordem para respeitar FKs
         try:
             self.conn.execute("BEGIN")
@@ -249,8 +680,8 @@ class SQLiteStorage:
 
             if table_exists("articles"):
                 self.conn.execute(
-                    "INSERT OR IGNORE INTO artigos (url, title, body, date, matched_names, scraped_at, updated_at) "
-                    "SELECT url, title, body, date, matched_names, scraped_at, updated_at FROM articles"
+                    "INSERT OR IGNORE INTO artigos (url, title, body, date, scraped_at, updated_at) "
+                    "SELECT url, title, body, date, scraped_at, updated_at FROM articles"
                 )
 
             if table_exists("comments"):
@@ -277,7 +708,42 @@ class SQLiteStorage:
             self.conn.execute("DROP TABLE IF EXISTS articles;")
             self.conn.execute("DROP TABLE IF EXISTS people;")
 
+            self.conn.execute(f"PRAGMA user_version = {_MIGRATED_VERSION}")
+            self.conn.execute("COMMIT")
+        except Exception:
+            self.conn.execute("ROLLBACK")
+            raise
+
+    def _drop_matched_names(self) -> None:
+        """Remove ``artigos.matched_names``: os nomes citados já estão em artigos_pessoas."""
+        cur = self.conn.cursor()
+        if cur.execute("PRAGMA user_version").fetchone()[0] >= _NO_MATCHED_NAMES_VERSION:
+            return
+        cols = {row[1] for row in cur.execute("PRAGMA table_info(artigos)")}
+        if "matched_names" in cols and sqlite3.sqlite_version_info < (3, 35, 0):
+            return  # sem DROP COLUMN: a coluna fica, apenas sem uso
+        try:
+            self.conn.execute("BEGIN")
+            if "matched_names" in cols:
+                self.conn.execute("ALTER TABLE artigos DROP COLUMN matched_names")
+            self.conn.execute(f"PRAGMA user_version = {_NO_MATCHED_NAMES_VERSION}")
+            self.conn.execute("COMMIT")
+        except Exception:
+            self.conn.execute("ROLLBACK")
+            raise
+
+    def _add_content_hash(self) -> None:
+        """Acrescenta ``artigos.content_hash`` em bancos criados antes da coluna."""
+        cur = self.conn.cursor()
+        if cur.execute("PRAGMA user_version").fetchone()[0] >= _CONTENT_HASH_VERSION:
+            return
+        cols = {row[1] for row in cur.execute("PRAGMA table_info(artigos)")}
+        try:
+            self.conn.execute("BEGIN")
+            if "content_hash" not in cols:
+                self.conn.execute("ALTER TABLE artigos ADD COLUMN content_hash BLOB")
+            self.conn.execute(f"PRAGMA user_version = {_CONTENT_HASH_VERSION}")
             self.conn.execute("COMMIT")
         except Exception:
             self.conn.execute("ROLLBACK")
-            raise
\ No newline at end of file
+            raise
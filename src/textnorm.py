@@ -0,0 +1,27 @@
+from __future__ import annotations
+
+import unicodedata
+
+
+def strip_accents(text: str) -> str:
+    """Remove diacríticos (NFKD + descarte das marcas combinantes).
+
+    Em vez de filtrar caractere a caractere em Python, testa só os
+    caracteres distintos do texto e remove cada marca com ``str.replace``.
+    """
+    if not text:
+        return ""
+    if text.isascii():
+        return text
+    t = unicodedata.normalize("NFKD", text)
+    if t.isascii():
+        return t
+    for ch in set(t):
+        if unicodedata.combining(ch):
+            t = t.replace(ch, "")
+    return t
+
+
+def normalize(text: str) -> str:
+    """Lowercase + remove diacríticos + colapsa espaços."""
+    return " ".join(strip_accents(text).lower().split())